@@ -4,8 +4,9 @@ import json
 import voluptuous as vol
 from datetime import timedelta
 
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, EVENT_HOMEASSISTANT_STOP
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.components.frontend import add_extra_js_url
 from homeassistant.helpers.event import async_track_time_interval
@@ -14,7 +15,14 @@ from homeassistant.helpers import discovery
 
 from .coordinator import RadarCoordinator
 from .processor import RadarProcessor
-from .const import DOMAIN, CONF_RADARS
+from .heatmap import OccupancyHeatmap
+from .history import FrameHistory
+from .zone_stats import ZoneStatistics
+from .websocket import async_register_commands
+from .const import (
+    DOMAIN, CONF_RADARS, HEATMAP_BUCKETS, HEATMAP_FLUSH_INTERVAL, ZONE_ENTITY_MODES,
+    EVENT_ZONE_ENTER, STATS_FLUSH_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,6 +44,8 @@ UPDATE_ZONE_SCHEMA = vol.Schema({
     vol.Optional("delay"): vol.Coerce(float),
     vol.Optional("name"): cv.string,
     vol.Optional("map_group"): cv.string,
+    vol.Optional("tolerance"): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+    vol.Optional("max_vertices"): vol.All(vol.Coerce(int), vol.Any(0, vol.Range(min=3, max=1000))),
 })
 UPDATE_LAYOUT_SCHEMA = vol.Schema({
     vol.Required("radar_name"): cv.string,
@@ -47,6 +57,19 @@ UPDATE_GLOBAL_CONFIG_SCHEMA = vol.Schema({
     vol.Optional("merge_distance"): vol.Coerce(float),
     vol.Optional("target_height"): vol.Coerce(float),
     vol.Optional("fused_color"): cv.string,
+    vol.Optional("history_seconds"): vol.All(vol.Coerce(float), vol.Range(min=1, max=600)),
+    vol.Optional("history_frames"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional("zone_hysteresis"): vol.All(vol.Coerce(float), vol.Range(min=0, max=20)),
+    vol.Optional("zone_min_dwell"): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+    vol.Optional("zone_entities"): vol.In(ZONE_ENTITY_MODES),
+    vol.Optional("max_point_age"): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+    vol.Optional("zone_simplify_tolerance"): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+    vol.Optional("zone_max_vertices"): vol.All(vol.Coerce(int), vol.Any(0, vol.Range(min=3, max=1000))),
+})
+GET_HEATMAP_SCHEMA = vol.Schema({
+    vol.Optional("map_group", default="default"): cv.string,
+    vol.Optional("bucket", default="daily"): vol.In(list(HEATMAP_BUCKETS)),
+    vol.Optional("index"): vol.Coerce(int),
 })
 
 async def async_setup(hass: HomeAssistant, config: dict):
@@ -63,10 +86,22 @@ async def async_setup(hass: HomeAssistant, config: dict):
     coordinator = RadarCoordinator(hass)
     await coordinator.async_load()
     
-    processor = RadarProcessor(hass, coordinator)
+    heatmap = OccupancyHeatmap(hass)
+    await heatmap.async_load()
+
+    history = FrameHistory(coordinator)
+
+    zone_stats = ZoneStatistics(hass, coordinator)
+    processor = RadarProcessor(hass, coordinator, heatmap, history, zone_stats)
 
     hass.data[DOMAIN]["coordinator"] = coordinator
     hass.data[DOMAIN]["processor"] = processor
+    hass.data[DOMAIN]["heatmap"] = heatmap
+    hass.data[DOMAIN]["zone_stats"] = zone_stats
+    hass.data[DOMAIN]["history"] = history
+    hass.data[DOMAIN]["latency"] = processor.latency
+    hass.data[DOMAIN]["raw_points"] = processor.raw_points
+    hass.data[DOMAIN]["load"] = processor.load
     hass.data[DOMAIN]["timer_remove"] = None
 
     for platform in ["sensor", "binary_sensor"]:
@@ -109,8 +144,14 @@ async def async_setup(hass: HomeAssistant, config: dict):
         map_group = call.data.get("map_group")
         
         zone_data = {"points": points, "delay": delay, "name": name}
-        await coordinator.async_update_zone(radar_name, zone_type, zone_data, map_group)
+        result = await coordinator.async_update_zone(
+            radar_name, zone_type, zone_data, map_group,
+            call.data.get("tolerance"), call.data.get("max_vertices")
+        )
         await processor.update(force=True)
+        if result is None and call.return_response:
+            raise HomeAssistantError(f"Zone not saved: no {zone_type} target for radar '{radar_name}'")
+        return result
 
     async def handle_update_radar_layout(call: ServiceCall):
         radar_name = call.data["radar_name"]
@@ -135,21 +176,39 @@ async def async_setup(hass: HomeAssistant, config: dict):
             if "radars" not in new_data or "maps" not in new_data:
                 raise ValueError("Invalid JSON format")
             
-            coordinator.data = new_data
-            await coordinator.async_save()
-            saved_interval = new_data.get("global_config", {}).get("update_interval", 0.1)
-            start_processing_loop(saved_interval)
+            diff = await coordinator.async_import(new_data)
+            _LOGGER.info(
+                f"RMM: Imported config: {len(diff.radars_added)} radars added, {len(diff.radars_removed)} removed, "
+                f"{len(diff.radars_changed)} changed; {len(diff.zones_added)} zones added, "
+                f"{len(diff.zones_removed)} removed, {len(diff.zones_changed)} changed."
+            )
+            if "update_interval" in diff.global_changed:
+                start_processing_loop(float(coordinator.model.global_config.get("update_interval", 0.1)))
             await processor.update(force=True)
         except Exception as e:
             _LOGGER.error(f"RMM: Import failed: {e}")
 
+    async def handle_get_heatmap(call: ServiceCall):
+        try:
+            return heatmap.snapshot(call.data["map_group"], call.data["bucket"], call.data.get("index"))
+        except ValueError as e:
+            raise HomeAssistantError(str(e)) from e
+
     hass.services.async_register(DOMAIN, "add_radar", handle_add_radar, schema=ADD_RADAR_SCHEMA)
     hass.services.async_register(DOMAIN, "remove_radar", handle_remove_radar, schema=REMOVE_RADAR_SCHEMA)
-    hass.services.async_register(DOMAIN, "update_radar_zone", handle_update_radar_zone, schema=UPDATE_ZONE_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, "update_radar_zone", handle_update_radar_zone,
+        schema=UPDATE_ZONE_SCHEMA, supports_response=SupportsResponse.OPTIONAL
+    )
     hass.services.async_register(DOMAIN, "update_radar_layout", handle_update_radar_layout, schema=UPDATE_LAYOUT_SCHEMA)
     hass.services.async_register(DOMAIN, "generate_radar_config", handle_generate_config)
     hass.services.async_register(DOMAIN, "update_global_config", handle_update_global_config, schema=UPDATE_GLOBAL_CONFIG_SCHEMA)
     hass.services.async_register(DOMAIN, "import_config", handle_import_config)
+    hass.services.async_register(
+        DOMAIN, "get_heatmap", handle_get_heatmap,
+        schema=GET_HEATMAP_SCHEMA, supports_response=SupportsResponse.ONLY
+    )
+    async_register_commands(hass)
 
     await processor.async_start()
     
@@ -160,4 +219,11 @@ async def async_setup(hass: HomeAssistant, config: dict):
 
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, initial_startup)
 
+    async_track_time_interval(hass, heatmap.async_flush, timedelta(seconds=HEATMAP_FLUSH_INTERVAL))
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, heatmap.async_flush)
+
+    hass.bus.async_listen(EVENT_ZONE_ENTER, zone_stats.handle_zone_enter)
+    async_track_time_interval(hass, zone_stats.async_flush, timedelta(seconds=STATS_FLUSH_INTERVAL))
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, zone_stats.async_flush)
+
     return True
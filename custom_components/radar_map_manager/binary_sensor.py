@@ -5,7 +5,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify
 from homeassistant.helpers import entity_registry as er
-from .const import DOMAIN
+from .const import DOMAIN, ZONE_ENTITIES_PER_ZONE, ZONE_ENTITIES_AGGREGATED
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,44 +24,62 @@ class RadarBinarySensorManager:
         self.coordinator = coordinator
         self.add_entities = add_entities_callback
         self.sensors = {} 
+        self._revision = None
 
     @callback
     def update_sensors_callback(self):
+        if self._revision == self.coordinator.revision: return
         self.hass.async_create_task(self.update_sensors())
 
     async def update_sensors(self):
-        data = self.coordinator.data
-        if not data or ('maps' not in data and 'radars' not in data): return
+        model = self.coordinator.model
+        if model is None: return
+
+        # Only map groups whose Detect zones changed are reconciled; None means all of them.
+        diff = self.coordinator.changes_since(self._revision)
+        self._revision = self.coordinator.revision
+        scope = None
+        if diff is not None and not diff.full and "zone_entities" not in diff.global_changed:
+            scope = diff.zone_maps("include_zones")
+            if not scope: return
+
+        mode = model.global_config.get("zone_entities", ZONE_ENTITIES_PER_ZONE)
 
         desired_sensors = {}
 
-        if 'maps' in data:
-            for map_group, map_data in data['maps'].items():
-                group_slug = slugify(map_group)
-                zones = map_data.get('zones', {})
-                
-                for z_type in ['include_zones']:
-                    if z_type in zones:
-                        for idx, zone in enumerate(zones[z_type]):
-                            z_name = zone.get('name', f"{z_type}_{idx}")
-                            safe_name = slugify(z_name)
-                            uid = f"rmm_{group_slug}_{safe_name}_occupancy"
-                            desired_sensors[uid] = {
-                                'name': z_name,
-                                'type': z_type,
-                                'points': zone.get('points', []),
-                                'delay': zone.get('delay', 0),
-                                'map_group': map_group
-                            }
+        for map_group, group in model.maps.items():
+            if mode == ZONE_ENTITIES_AGGREGATED: break
+            if scope is not None and map_group not in scope: continue
+            group_slug = slugify(map_group)
+
+            for z_type in ['include_zones']:
+                for idx, zone in enumerate(group.zones(z_type)):
+                    z_name = zone.label(z_type, idx)
+                    safe_name = slugify(z_name)
+                    uid = f"rmm_{group_slug}_{safe_name}_occupancy"
+                    desired_sensors[uid] = {
+                        'name': z_name,
+                        'type': z_type,
+                        'points': zone.points,
+                        'polygon': zone.polygon,
+                        'delay': zone.delay,
+                        'map_group': map_group
+                    }
 
         ent_reg = er.async_get(self.hass)
         entries_to_remove = []
-        
-        for entity_id, entry in ent_reg.entities.items():
-            uid_str = str(entry.unique_id)
-            if entry.domain == "binary_sensor" and (entry.platform == DOMAIN or uid_str.startswith("rmm_")):
-                if uid_str not in desired_sensors:
-                    entries_to_remove.append(entity_id)
+
+        if scope is None:
+            for entity_id, entry in ent_reg.entities.items():
+                uid_str = str(entry.unique_id)
+                if entry.domain == "binary_sensor" and (entry.platform == DOMAIN or uid_str.startswith("rmm_")):
+                    if uid_str not in desired_sensors:
+                        entries_to_remove.append(entity_id)
+        else:
+            for uid, sensor in self.sensors.items():
+                if sensor.config['map_group'] in scope and uid not in desired_sensors:
+                    entity_id = ent_reg.async_get_entity_id("binary_sensor", DOMAIN, uid)
+                    if entity_id: entries_to_remove.append(entity_id)
 
         for entity_id in entries_to_remove:
             _LOGGER.info(f"RMM: Removing redundant entity {entity_id}")
@@ -86,7 +104,7 @@ class RadarBinarySensorManager:
                 sensor = RadarZoneSensor(self.coordinator, uid, config)
                 self.sensors[uid] = sensor
                 to_add.append(sensor)
-            else:
+            elif self.sensors[uid].config != config:
                 self.sensors[uid].update_config(config)
 
         if to_add:
@@ -125,38 +143,15 @@ class RadarZoneSensor(CoordinatorEntity, BinarySensorEntity):
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        data = self.coordinator.data or {}
-        map_group = self.config['map_group']
-        zone_points = self.config.get('points', [])
-        
-        maps_data = data.get('maps', {})
-        target_map_data = maps_data.get(map_group)
-        
-        if not target_map_data:
-            for k, v in maps_data.items():
-                if k.lower() == map_group.lower():
-                    target_map_data = v
-                    break
-        
-        fused_targets = target_map_data.get('targets', []) if target_map_data else []
-        
+        polygon = self.config.get('polygon')
+
         is_triggered = False
-        
-        for t in fused_targets:
-            tx, ty = 0.0, 0.0
-            if isinstance(t, dict):
-                tx = float(t.get('x', 0))
-                ty = float(t.get('y', 0))
-            elif isinstance(t, (list, tuple)) and len(t) >= 2:
-                tx = float(t[0])
-                ty = float(t[1])
-            else:
-                continue
+        if polygon is not None:
+            for t in self.coordinator.get_targets(self.config['map_group']):
+                if polygon.contains(float(t.get('x', 0)), float(t.get('y', 0))):
+                    is_triggered = True
+                    break
 
-            if self._is_point_in_polygon(tx, ty, zone_points):
-                is_triggered = True
-                break
-        
         now = time.time()
         delay_sec = float(self.config.get('delay', 0))
 
@@ -173,23 +168,3 @@ class RadarZoneSensor(CoordinatorEntity, BinarySensorEntity):
         if self._is_on != should_be_on:
             self._is_on = should_be_on
             self.async_write_ha_state()
-
-    def _is_point_in_polygon(self, x, y, poly):
-        if not poly or len(poly) < 3: return False
-        inside = False
-        j = len(poly) - 1
-        for i in range(len(poly)):
-            try:
-                p_i = poly[i]
-                p_j = poly[j]
-                
-                xi = float(p_i[0]) if isinstance(p_i, (list, tuple)) else float(p_i.get('x', 0))
-                yi = float(p_i[1]) if isinstance(p_i, (list, tuple)) else float(p_i.get('y', 0))
-                xj = float(p_j[0]) if isinstance(p_j, (list, tuple)) else float(p_j.get('x', 0))
-                yj = float(p_j[1]) if isinstance(p_j, (list, tuple)) else float(p_j.get('y', 0))
-                
-                intersect = ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi)
-                if intersect: inside = not inside
-                j = i
-            except: return False
-        return inside
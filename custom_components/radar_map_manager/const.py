@@ -16,3 +16,39 @@ SIGNAL_ZONES_UPDATED = "radar_map_manager_zones_updated"
 ID_UPDATE_INTERVAL = "rmm_update_interval"
 ID_MERGE_DISTANCE = "rmm_merge_distance"
 SIGNAL_CONFIG_UPDATED = "rmm_config_updated"
+
+HEATMAP_RESOLUTION = 100
+HEATMAP_FLUSH_INTERVAL = 300
+HEATMAP_MAX_TICK = 2.0
+HEATMAP_BUCKETS = {"hourly": 24, "daily": 7}
+HEATMAP_DECAY = 0.9
+
+HISTORY_DEFAULT_SECONDS = 30
+HISTORY_MAX_FRAMES = 6000
+HISTORY_MAX_TARGETS = 16
+
+EVENT_ZONE_ENTER = "radar_map_manager_zone_enter"
+EVENT_ZONE_EXIT = "radar_map_manager_zone_exit"
+EVENT_TRACK_GATE = 10.0
+EVENT_TRACK_TIMEOUT = 1.5
+
+ZONE_ENTITIES_PER_ZONE = "per_zone"
+ZONE_ENTITIES_AGGREGATED = "aggregated"
+ZONE_ENTITIES_BOTH = "both"
+ZONE_ENTITY_MODES = [ZONE_ENTITIES_PER_ZONE, ZONE_ENTITIES_AGGREGATED, ZONE_ENTITIES_BOTH]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LOAD_BUDGET_FRACTION = 0.5
+LOAD_WINDOW = 50
+LOAD_RECOVER_FRACTION = 0.6
+LOAD_MAX_LEVEL = 3
+LOAD_COOLDOWN_WINDOWS = 4
+LOAD_COOLDOWN_MAX_WINDOWS = 64
+LOAD_IDLE_MAP_DIVISOR = 5
+
+STATS_MAX_TICK = 2.0
+STATS_SHORT_PERIOD = 300
+STATS_SHORT_KEEP = 288
+STATS_HOUR = 3600
+STATS_FLUSH_INTERVAL = 300
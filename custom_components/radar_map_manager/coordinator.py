@@ -1,40 +1,80 @@
 """Data coordinator for Radar Map Manager (V1.0.0 Release)."""
 import logging
+from collections import deque
 from homeassistant.helpers.storage import Store
 from .const import DOMAIN
+from .model import (
+    ConfigModel, ConfigDiff, Radar, Zone, diff_models,
+    DEFAULT_MAP, DEFAULT_LAYOUT, MAP_ZONE_TYPES, RADAR_ZONE_TYPES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 STORAGE_VERSION = 1
 STORAGE_KEY = DOMAIN
-DATA_VERSION = 1
+CHANGE_LOG_SIZE = 64
 
 class RadarCoordinator:
- 
+
     def __init__(self, hass):
         self.hass = hass
         self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
-        self.data = self._get_empty_data()
+        self.model = ConfigModel()
+        self.revision = 0
+        self.targets = {}
+        self._data_cache = None
+        self._data_cache_rev = -1
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
         self._listeners = []
-        self.last_update_success = True 
+        self.last_update_success = True
         self.name = "RadarMapManager Coordinator"
 
     def _get_empty_data(self):
-        return {
-            "version": DATA_VERSION,
-            "global_config": {
-                "update_interval": 0.1, 
-                "merge_distance": 0.8,
-                "target_height": 1.5,
-                "fused_color": "#FFD700"
-            },
-            "maps": {
-                "default": {
-                    "zones": {"include_zones": [], "exclude_zones": []}
-                }
-            },
-            "radars": {}
-        }
+        return ConfigModel().to_dict()
+
+    @property
+    def data(self):
+        """Plain-dict view of the model, rebuilt lazily once per revision."""
+        if self._data_cache_rev != self.revision:
+            self._data_cache = self.model.to_dict()
+            self._data_cache_rev = self.revision
+        return self._data_cache
+
+    @data.setter
+    def data(self, raw):
+        self._replace_model(ConfigModel.from_dict(raw))
+
+    def _replace_model(self, new_model):
+        diff = diff_models(self.model, new_model)
+        self.model = new_model
+        self._bump_revision(diff)
+
+    def _bump_revision(self, diff=None):
+        self.model.reindex()
+        self.revision += 1
+        self._changes.append((self.revision, diff if diff is not None else ConfigDiff(full=True)))
+
+    def changes_since(self, revision):
+        """Merged diff of every revision after `revision`; None when it has to be rebuilt from scratch."""
+        if revision is None: return None
+        if revision >= self.revision: return ConfigDiff()
+        if not self._changes or self._changes[0][0] > revision + 1: return None
+
+        merged = ConfigDiff()
+        for rev, diff in self._changes:
+            if rev > revision:
+                merged = merged.merge(diff)
+        return merged
+
+    def get_targets(self, map_group):
+        targets = self.targets.get(map_group)
+        if targets is None:
+            map_id = self.model.resolve_map_id(map_group)
+            targets = self.targets.get(map_id, []) if map_id is not None else []
+        return targets
+
+    def set_targets(self, map_group, targets):
+        self.targets[map_group] = targets
 
     def async_add_listener(self, callback, context=None):
         self._listeners.append(callback)
@@ -64,68 +104,138 @@ class RadarCoordinator:
             return
 
         self.data = raw_data
-        
-        if "maps" not in self.data: self.data["maps"] = {}
-        if "default" not in self.data["maps"]:
-            self.data["maps"]["default"] = {"zones": {"include_zones": [], "exclude_zones": []}}
-        if "radars" not in self.data: self.data["radars"] = {}
-        if "global_config" not in self.data: self.data["global_config"] = {}
-        
-        if "fused_color" not in self.data["global_config"]:
-            self.data["global_config"]["fused_color"] = "#FFD700"
-
-        _LOGGER.info(f"RMM: Data loaded (V{self.data.get('version', 1)}).")
+
+        _LOGGER.info(f"RMM: Data loaded (V{self.model.version}).")
 
     async def async_save(self):
         await self._store.async_save(self.data)
         self._notify_listeners()
 
+    async def async_import(self, raw):
+        """Replace the configuration, returning what actually changed.
+
+        Zones that are new or edited relative to the running model go through the
+        vertex budget; zones that came back unchanged are stored as they are.
+        """
+        new_model = ConfigModel.from_dict(raw)
+        for map_id, group in new_model.maps.items():
+            old_group = self.model.maps.get(map_id)
+            for zone_type in MAP_ZONE_TYPES:
+                self._simplify_edited(group.zones(zone_type), old_group.zones(zone_type) if old_group else [])
+        for name, radar in new_model.radars.items():
+            old_radar = self.model.radars.get(name)
+            self._simplify_edited(radar.monitor_zones, old_radar.monitor_zones if old_radar else [])
+
+        self._replace_model(new_model)
+        diff = self._changes[-1][1]
+        await self.async_save()
+        return diff
+
     async def async_add_radar(self, name, map_group="default"):
-        if name in self.data["radars"]: return
-        self.data["radars"][name] = {
-            "map_group": map_group,
-            "layout": {"origin_x": 50, "origin_y": 50, "scale_x": 5, "scale_y": 5, "rotation": 0},
-            "monitor_zones": []
-        }
-        if map_group not in self.data["maps"]:
-            self.data["maps"][map_group] = {"zones": {"include_zones": [], "exclude_zones": []}}
+        if name in self.model.radars: return
+        diff = ConfigDiff(radars_added={name}, radar_maps={map_group})
+        if map_group not in self.model.maps:
+            diff.maps_added.add(map_group)
+        self.model.radars[name] = Radar(name=name, map_group=map_group, layout=dict(DEFAULT_LAYOUT))
+        self.model.ensure_map(map_group)
+        self._bump_revision(diff)
         await self.async_save()
 
     async def async_remove_radar(self, name):
-        if name in self.data["radars"]:
-            del self.data["radars"][name]
+        if name in self.model.radars:
+            radar = self.model.radars.pop(name)
+            self._bump_revision(ConfigDiff(radars_removed={name}, radar_maps={radar.map_group}))
             await self.async_save()
 
-    async def async_update_zone(self, radar_name, zone_type, points, map_group="default"):
-        if radar_name and radar_name in self.data["radars"]:
-            if zone_type in ["monitor_zones"]:
-                self.data["radars"][radar_name][zone_type] = points
-                await self.async_save()
-                return
-
-        target_map = map_group or "default"
-        
-        if target_map not in self.data["maps"]:
-             self.data["maps"][target_map] = {"zones": {"include_zones": [], "exclude_zones": []}}
+    def _simplify(self, zone, tolerance=None, max_vertices=None):
+        global_config = self.model.global_config
+        if tolerance is None:
+            tolerance = float(global_config.get("zone_simplify_tolerance", 0) or 0)
+        if max_vertices is None:
+            max_vertices = int(global_config.get("zone_max_vertices", 0) or 0)
+        return zone.simplified(tolerance, max_vertices)
+
+    def _simplify_edited(self, zones, old_zones):
+        known = {}
+        for zone in old_zones:
+            known.setdefault((zone.slug, len(zone.points)), []).append(zone)
+        for idx, zone in enumerate(zones):
+            if zone not in known.get((zone.slug, len(zone.points)), ()):
+                zones[idx] = self._simplify(zone)
+
+    async def async_update_zone(self, radar_name, zone_type, zone_data, map_group="default",
+                                tolerance=None, max_vertices=None):
+        """Store one zone after simplification; returns the stored geometry and the reduction."""
+        original = Zone.from_dict(zone_data)
+        zone = self._simplify(original, tolerance, max_vertices)
+        before, after = len(original.points), len(zone.points)
+        result = {
+            "name": zone.name,
+            "zone_type": zone_type,
+            "points": zone.points,
+            "vertices_before": before,
+            "vertices_after": after,
+            "reduction": round(1 - after / before, 3) if before else 0.0,
+        }
 
-        if zone_type in ["include_zones", "exclude_zones"]:
-            self.data["maps"][target_map]["zones"][zone_type] = points
+        if radar_name and radar_name in self.model.radars:
+            if zone_type in RADAR_ZONE_TYPES:
+                radar = self.model.radars[radar_name]
+                self._upsert_zone(radar.monitor_zones, zone)
+                self._bump_revision(ConfigDiff(radars_changed={radar_name}, radar_maps={radar.map_group}))
+                await self.async_save()
+                return {**result, "radar_name": radar_name, "map_group": radar.map_group}
+
+        if zone_type in MAP_ZONE_TYPES:
+            map_id = map_group or DEFAULT_MAP
+            diff = ConfigDiff()
+            if map_id not in self.model.maps:
+                diff.maps_added.add(map_id)
+            group = self.model.ensure_map(map_id)
+            replaced = self._upsert_zone(group.zones(zone_type), zone, self.model.zone_index.get((map_id, zone_type)))
+            key = (map_id, zone_type, zone.slug if zone.name else None)
+            (diff.zones_changed if replaced or key[2] is None else diff.zones_added).add(key)
+            self._bump_revision(diff)
             await self.async_save()
+            return {**result, "map_group": map_id}
+
+        return None
+
+    def _upsert_zone(self, zones, zone, positions=None):
+        if positions is not None:
+            idx = positions.get(zone.slug)
+            if idx is None:
+                zones.append(zone)
+                return False
+            zones[idx] = zone
+            return True
+
+        for idx, existing in enumerate(zones):
+            if existing.slug == zone.slug:
+                zones[idx] = zone
+                return True
+        zones.append(zone)
+        return False
 
     async def async_update_layout(self, radar_name, layout, map_group=None):
-        if radar_name in self.data["radars"]:
-            current = self.data["radars"][radar_name].get("layout", {})
-            current.update(layout)
-            self.data["radars"][radar_name]["layout"] = current
-            
-            if map_group:
-                self.data["radars"][radar_name]["map_group"] = map_group
-                if map_group not in self.data["maps"]:
-                    self.data["maps"][map_group] = {"zones": {"include_zones": [], "exclude_zones": []}}
-
-            await self.async_save()
+        radar = self.model.radars.get(radar_name)
+        if radar is None: return
+
+        diff = ConfigDiff(radars_changed={radar_name}, radar_maps={radar.map_group})
+        radar.layout.update(layout)
+        if map_group:
+            if map_group not in self.model.maps:
+                diff.maps_added.add(map_group)
+            radar.map_group = map_group
+            diff.radar_maps.add(map_group)
+            self.model.ensure_map(map_group)
+
+        self._bump_revision(diff)
+        await self.async_save()
 
     async def async_update_global_config(self, config_data):
-        if "global_config" not in self.data: self.data["global_config"] = {}
-        self.data["global_config"].update(config_data)
-        await self.async_save()
\ No newline at end of file
+        global_config = self.model.global_config
+        changed = {k for k, v in config_data.items() if global_config.get(k) != v}
+        global_config.update(config_data)
+        self._bump_revision(ConfigDiff(global_changed=changed))
+        await self.async_save()
@@ -0,0 +1,162 @@
+"""Zone enter/exit event engine for Radar Map Manager (V1.0.0 Release)."""
+import itertools
+import logging
+import math
+import time
+
+from homeassistant.util import slugify
+
+from .const import (
+    EVENT_ZONE_ENTER, EVENT_ZONE_EXIT, EVENT_TRACK_GATE, EVENT_TRACK_TIMEOUT,
+    ZONE_ENTITIES_PER_ZONE, ZONE_ENTITIES_AGGREGATED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Track:
+    __slots__ = ("track_id", "x", "y", "last_seen", "zones")
+
+    def __init__(self, track_id, x, y, now):
+        self.track_id = track_id
+        self.x = x
+        self.y = y
+        self.last_seen = now
+        self.zones = {}
+
+
+class ZoneEventEngine:
+    """Follows fused targets across ticks and fires bus events on real zone transitions.
+
+    A target enters a zone once it has been at least `zone_hysteresis` map
+    percent inside the edge for `zone_min_dwell` seconds, and exits once it
+    is at least `zone_hysteresis` outside the edge, its track is lost, or the
+    zone is removed or renamed (reported with `reason: zone_removed`).
+    """
+
+    def __init__(self, hass, coordinator):
+        self.hass = hass
+        self._coordinator = coordinator
+        self._tracks = {}
+        self._ids = itertools.count(1)
+        self._zones = {}
+        self._revision = None
+        self._band = 1.0
+        self._min_dwell = 0.5
+        self._aggregated = False
+
+    def _configure(self, now):
+        model = self._coordinator.model
+        self._band = max(0.0, float(model.global_config.get("zone_hysteresis", 1.0)))
+        self._min_dwell = max(0.0, float(model.global_config.get("zone_min_dwell", 0.5)))
+        self._aggregated = model.global_config.get("zone_entities", ZONE_ENTITIES_PER_ZONE) == ZONE_ENTITIES_AGGREGATED
+
+        self._zones = {}
+        for map_id, group in model.maps.items():
+            zones = []
+            for idx, zone in enumerate(group.include_zones):
+                if zone.polygon is None: continue
+                name = zone.label("include_zones", idx)
+                zones.append((slugify(name), name, zone.polygon))
+            self._zones[map_id] = zones
+
+        for map_id, tracks in self._tracks.items():
+            valid = {slug for slug, _, _ in self._zones.get(map_id, [])}
+            for track in tracks.values():
+                for slug in list(track.zones):
+                    if slug in valid: continue
+                    state = track.zones.pop(slug)
+                    if state["inside"]:
+                        self._fire(
+                            EVENT_ZONE_EXIT, map_id, slug, state["name"], track,
+                            now - state["entered"], reason="zone_removed",
+                        )
+
+        self._revision = self._coordinator.revision
+
+    def process(self, targets_by_map, now=None):
+        now = time.monotonic() if now is None else now
+        if self._revision != self._coordinator.revision:
+            self._configure(now)
+
+        for map_group, targets in targets_by_map.items():
+            zones = self._zones.get(map_group)
+            tracks = self._tracks.setdefault(map_group, {})
+            if not zones and not tracks: continue
+
+            for track in self._associate(tracks, targets, now):
+                self._update_membership(map_group, track, zones or [], now)
+
+            for track_id in [tid for tid, t in tracks.items() if now - t.last_seen > EVENT_TRACK_TIMEOUT]:
+                track = tracks.pop(track_id)
+                for slug, state in track.zones.items():
+                    if state["inside"]:
+                        self._fire(EVENT_ZONE_EXIT, map_group, slug, state["name"], track, now - state["entered"])
+
+    def _associate(self, tracks, targets, now):
+        pairs = []
+        for t_idx, target in enumerate(targets):
+            for track in tracks.values():
+                d = math.hypot(track.x - target["x"], track.y - target["y"])
+                if d <= EVENT_TRACK_GATE:
+                    pairs.append((d, t_idx, track.track_id))
+        pairs.sort()
+
+        matched_targets, matched_tracks, updated = set(), set(), []
+        for _, t_idx, track_id in pairs:
+            if t_idx in matched_targets or track_id in matched_tracks: continue
+            matched_targets.add(t_idx)
+            matched_tracks.add(track_id)
+            track = tracks[track_id]
+            track.x, track.y, track.last_seen = targets[t_idx]["x"], targets[t_idx]["y"], now
+            updated.append(track)
+
+        for t_idx, target in enumerate(targets):
+            if t_idx in matched_targets: continue
+            track = _Track(f"track_{next(self._ids)}", target["x"], target["y"], now)
+            tracks[track.track_id] = track
+            updated.append(track)
+        return updated
+
+    def _update_membership(self, map_group, track, zones, now):
+        x, y = track.x, track.y
+        for slug, name, polygon in zones:
+            state = track.zones.get(slug)
+            if state is None:
+                state = track.zones[slug] = {"name": name, "inside": False, "since": None, "entered": None}
+
+            raw_in = polygon.contains(x, y)
+            if not state["inside"]:
+                if raw_in and polygon.distance_to_edge(x, y) >= self._band:
+                    if state["since"] is None:
+                        state["since"] = now
+                    if now - state["since"] >= self._min_dwell:
+                        state["inside"] = True
+                        state["entered"] = now
+                        self._fire(EVENT_ZONE_ENTER, map_group, slug, name, track)
+                else:
+                    state["since"] = None
+            elif not raw_in and polygon.distance_to_edge(x, y) >= self._band:
+                state["inside"] = False
+                state["since"] = None
+                self._fire(EVENT_ZONE_EXIT, map_group, slug, name, track, now - state["entered"])
+
+    def _fire(self, event_type, map_group, slug, name, track, dwell=None, reason=None):
+        if self._aggregated:
+            entity_id = f"sensor.rmm_{slugify(map_group)}_zones"
+        else:
+            entity_id = f"binary_sensor.rmm_{slugify(map_group)}_{slug}_occupancy"
+        data = {
+            "map_group": map_group,
+            "zone": name,
+            "zone_slug": slug,
+            "entity_id": entity_id,
+            "target": track.track_id,
+            "x": round(track.x, 2),
+            "y": round(track.y, 2),
+        }
+        if dwell is not None:
+            data["dwell"] = round(dwell, 2)
+        if reason is not None:
+            data["reason"] = reason
+        self.hass.bus.async_fire(event_type, data)
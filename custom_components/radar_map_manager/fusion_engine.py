@@ -1,105 +1,229 @@
 """Fusion Engine for Radar Map Manager (V1.0.0 Release)."""
 import logging
 import math
+import time
+from .const import LOAD_IDLE_MAP_DIVISOR
+from .latency import LatencyTracker
 
 _LOGGER = logging.getLogger(__name__)
 
+
+class RawPointFeed:
+    """Per-map subscribers to projected radar points; nothing is collected without one."""
+
+    def __init__(self):
+        self._subscribers = {}
+
+    def subscribe(self, map_group, callback):
+        subscribers = self._subscribers.setdefault(map_group, [])
+        subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in subscribers:
+                subscribers.remove(callback)
+            if not subscribers and self._subscribers.get(map_group) is subscribers:
+                del self._subscribers[map_group]
+        return unsubscribe
+
+    def wants(self, map_group):
+        return map_group in self._subscribers
+
+    def publish(self, map_group, radars):
+        payload = {"map_group": map_group, "radars": radars}
+        for callback in list(self._subscribers.get(map_group, [])):
+            try:
+                callback(payload)
+            except Exception as e:
+                _LOGGER.error(f"RMM: Error in raw point subscriber: {e}")
+
+
 class FusionEngine:
     def __init__(self, hass, coordinator=None):
         self.hass = hass
         self.coordinator = coordinator
+        self._plan = {}
+        self._plan_revision = None
+        self._merge_dist = 0.8
+        self._target_h = 1.5
+        self._max_age = 0.0
+        self.latency = LatencyTracker()
+        self.raw_points = RawPointFeed()
+        self.level = 0
+        self._tick = 0
+        self._radar_cache = {}
 
     def update(self):
         if not self.coordinator: return
 
-        data = self.coordinator.data
-        if not data: return
-
-        global_config = data.get("global_config", {})
-        merge_dist = float(global_config.get("merge_distance", 0.8))
-        target_h = float(global_config.get("target_height", 1.5))
+        model = self.coordinator.model
+        if model is None: return
 
-        maps = data.get("maps", {})
-        radars = data.get("radars", {})
-        
-        map_targets = {}
+        if self._plan_revision != self.coordinator.revision:
+            diff = self.coordinator.changes_since(self._plan_revision)
+            self._rebuild_plan(model, None if diff is None or diff.full else diff.fusion_maps())
 
-        for r_name, r_conf in radars.items():
-            map_group = r_conf.get("map_group", "default")
-            if map_group not in map_targets: map_targets[map_group] = []
+        merge_dist = self._merge_dist
+        max_age = self._max_age
+        level = self.level
+        now = time.time()
+        self._tick += 1
 
-            layout = r_conf.get("layout", {})
-            monitor_zones = r_conf.get("monitor_zones", [])
+        for map_group, radar_plans in self._plan.items():
+            raw_out = {} if self.raw_points.wants(map_group) else None
 
-            current_map_data = maps.get(map_group, {})
-            current_map_zones = current_map_data.get("zones", {})
-            exclude_zones = current_map_zones.get("exclude_zones", [])
-            
-            origin_x = float(layout.get('origin_x', 50))
-            origin_y = float(layout.get('origin_y', 50))
+            # Degraded: map groups with nothing on them are fused only every few ticks.
+            if (level >= 1 and raw_out is None and not self.coordinator.targets.get(map_group)
+                    and self._tick % LOAD_IDLE_MAP_DIVISOR):
+                continue
 
-            for i in range(1, 4):
-                raw_point = self._get_radar_point(r_name, i)
-                if not raw_point: continue
+            points = []
+            for radar_plan in radar_plans:
+                r_name, sensor_ids = radar_plan[0], radar_plan[6]
+                raw_points = [(i, self._get_radar_point(*ids)) for i, ids in sensor_ids]
+                signature = tuple((i, rp['ts']) for i, rp in raw_points if rp) if level >= 2 else None
 
-                if not raw_point.get('is_1d') and abs(raw_point['x']) < 100 and abs(raw_point['y']) < 100:
+                # Degraded: a radar that reported nothing new keeps last pass's filtered points.
+                cached = self._radar_cache.get(r_name)
+                if (level >= 2 and raw_out is None and cached and cached[0] == signature
+                        and not (max_age > 0 and any(now - p['ts'] > max_age for p in cached[1]))):
+                    points.extend(cached[1])
                     continue
 
-                projected = self._calculate_standard_coord(layout, raw_point, target_h)
-                
-                if projected and projected.get('active'):
-                    px, py = projected['left'], projected['top']
-
-                    is_excluded = False
-                    if exclude_zones:
-                        for zone in exclude_zones:
-                            poly = zone.get("points", [])
-                            if poly and len(poly) >= 3:
-                                if self._point_in_polygon(px, py, poly):
-                                    is_excluded = True
-                                    break
-                    
-                    if is_excluded:
-                        continue 
-
-                    if monitor_zones:
-                        in_monitor = False
-                        for zone in monitor_zones:
-                            poly = zone.get("points", [])
-                            if poly and len(poly) >= 3:
-                                if self._point_in_polygon(px, py, poly):
-                                    in_monitor = True
-                                    break
-                        if not in_monitor: continue
-
-                    target_data = {
-                        "x": px,
-                        "y": py,
-                        "radar": r_name,
-                        "raw_id": i,
-                        "is_1d": raw_point.get('is_1d', False)
-                    }
-                    
-                    if target_data["is_1d"]:
-                        target_data["origin_x"] = origin_x
-                        target_data["origin_y"] = origin_y
+                radar_points = self._collect_radar(radar_plan, raw_points, now, raw_out)
+                self._radar_cache[r_name] = (signature, radar_points)
+                points.extend(radar_points)
 
-                    map_targets[map_group].append(target_data)
+            fused_results = self._cluster_targets(points, merge_dist, 0 if level >= 3 else 2)
+            published_at = time.time()
+            for p in points:
+                self.latency.observe(p['radar'], p['raw_id'], p['ts'], published_at)
 
-        for map_id, points in map_targets.items():
-            fused_results = self._cluster_targets(points, merge_dist)
-            
-            if map_id in maps:
-                maps[map_id]['targets'] = fused_results
-                
-            self._update_master_sensor(map_id, fused_results)
+            self.coordinator.set_targets(map_group, fused_results)
+            self._update_master_sensor(map_group, fused_results)
+            if raw_out is not None:
+                self.raw_points.publish(map_group, raw_out)
 
-    def _get_radar_point(self, r_name, i):
-        if not self.hass: return None
+    def _collect_radar(self, radar_plan, raw_points, now, raw_out):
+        """Project and filter one radar's points; rejected ones are reported to raw_out if given."""
+        r_name, projection, origin_x, origin_y, exclude_zones, monitor_zones, _ = radar_plan
+        target_h = self._target_h
+        max_age = self._max_age
+        points = []
+        if raw_out is not None: raw_out[r_name] = []
+
+        for i, raw_point in raw_points:
+            if not raw_point: continue
+
+            # Rejected points are only projected when an editor is watching the raw feed.
+            reason = None
+            changed_at = raw_point['ts']
+            if max_age > 0 and now - changed_at > max_age:
+                self.latency.drop_stale(r_name, i, changed_at)
+                reason = "stale"
+            elif not raw_point.get('is_1d') and abs(raw_point['x']) < 100 and abs(raw_point['y']) < 100:
+                reason = "origin"
+            if reason and raw_out is None: continue
+
+            if projection is None: continue
+            px, py = self._project(projection, raw_point, target_h)
+
+            if reason is None:
+                if exclude_zones and any(poly.covers(px, py) for poly in exclude_zones):
+                    reason = "exclude_zone"
+                elif monitor_zones and not any(poly.covers(px, py) for poly in monitor_zones):
+                    reason = "monitor_zone"
+
+            if raw_out is not None:
+                raw_out[r_name].append({
+                    "slot": i,
+                    "x": round(px, 2),
+                    "y": round(py, 2),
+                    "raw_x": round(raw_point['x'], 1),
+                    "raw_y": round(raw_point['y'], 1),
+                    "is_1d": raw_point.get('is_1d', False),
+                    "age": round(now - changed_at, 3),
+                    "excluded": reason
+                })
+
+            if reason: continue
+
+            target_data = {
+                "x": px,
+                "y": py,
+                "radar": r_name,
+                "raw_id": i,
+                "is_1d": raw_point.get('is_1d', False),
+                "ts": changed_at
+            }
+
+            if target_data["is_1d"]:
+                target_data["origin_x"] = origin_x
+                target_data["origin_y"] = origin_y
+
+            points.append(target_data)
+        return points
+
+    def _rebuild_plan(self, model, maps=None):
+        """Resolve per-map radar lists and compiled zones once per config revision.
+
+        With `maps` given only those map groups are re-resolved; the others keep their plan.
+        """
+        global_config = model.global_config
+        self._merge_dist = float(global_config.get("merge_distance", 0.8))
+        self._target_h = float(global_config.get("target_height", 1.5))
+        self._max_age = float(global_config.get("max_point_age", 0) or 0)
+        self.latency.prune(set(model.radars))
+        self._radar_cache = {}
+
+        if maps is None:
+            plan = {}
+            stale = [m for m in self.coordinator.targets if m not in model.radars_by_map]
+            maps = model.radars_by_map.keys()
+        else:
+            plan = self._plan
+            for map_group in maps:
+                plan.pop(map_group, None)
+            stale = [m for m in maps if m not in model.radars_by_map]
+        for map_group in stale:
+            self.coordinator.targets.pop(map_group, None)
+
+        for map_group in maps:
+            radars = model.radars_by_map.get(map_group)
+            if not radars: continue
+            exclude_zones = model.compiled_zones(map_group, "exclude_zones")
+            radar_plans = []
+            for radar in radars:
+                layout = radar.layout
+                monitor_zones = [z.polygon for z in radar.monitor_zones if z.polygon is not None]
+                radar_plans.append((
+                    radar.name,
+                    self._compile_layout(layout),
+                    float(layout.get('origin_x', 50)),
+                    float(layout.get('origin_y', 50)),
+                    exclude_zones,
+                    monitor_zones,
+                    self._sensor_ids(radar.name),
+                ))
+            plan[map_group] = radar_plans
+
+        self._plan = plan
+        self._plan_revision = self.coordinator.revision
+
+    @staticmethod
+    def _sensor_ids(r_name):
+        """Entity ids of each target slot: (slot, (x, y, distance or None))."""
         lower = r_name.lower()
-        
-        state_x = self.hass.states.get(f"sensor.{lower}_target_{i}_x")
-        state_y = self.hass.states.get(f"sensor.{lower}_target_{i}_y")
+        return tuple(
+            (i, (f"sensor.{lower}_target_{i}_x", f"sensor.{lower}_target_{i}_y",
+                 f"sensor.{lower}_distance" if i == 1 else None))
+            for i in range(1, 4)
+        )
+
+    def _get_radar_point(self, x_id, y_id, dist_id=None):
+        if not self.hass: return None
+
+        state_x = self.hass.states.get(x_id)
+        state_y = self.hass.states.get(y_id)
         
         if state_x and state_y:
             if state_x.state not in ['unavailable', 'unknown'] and state_y.state not in ['unavailable', 'unknown']:
@@ -109,11 +233,12 @@ class FusionEngine:
                     unit = state_y.attributes.get('unit_of_measurement', 'm')
                     if unit == 'm': x *= 1000; y *= 1000
                     elif unit == 'cm': x *= 10; y *= 10
-                    return {'x': x, 'y': y, 'z': 0, 'is_1d': False}
+                    ts = max(self._state_time(state_x), self._state_time(state_y))
+                    return {'x': x, 'y': y, 'z': 0, 'is_1d': False, 'ts': ts}
                 except ValueError: pass
 
-        if i == 1:
-            state_dist = self.hass.states.get(f"sensor.{lower}_distance")
+        if dist_id:
+            state_dist = self.hass.states.get(dist_id)
             
             if state_dist and state_dist.state not in ['unavailable', 'unknown']:
                 try:
@@ -125,55 +250,72 @@ class FusionEngine:
                     elif unit == 'cm': dist_mm = dist * 10
                     else: dist_mm = dist * 1000
                     
-                    return {'x': 0, 'y': dist_mm, 'z': 0, 'is_1d': True} 
+                    return {'x': 0, 'y': dist_mm, 'z': 0, 'is_1d': True, 'ts': self._state_time(state_dist)}
                 except: pass
                 
         return None
 
-    def _calculate_standard_coord(self, layout, point, target_h_m=1.5):
+    @staticmethod
+    def _state_time(state):
+        """Wall-clock time the device last reported this state.
+
+        last_reported also advances when a node re-sends an unchanged value, so
+        a person standing still is not mistaken for a frozen node.
+        """
+        stamp = getattr(state, "last_reported_timestamp", None)
+        if stamp is not None: return stamp
+        reported = getattr(state, "last_reported", None) or state.last_updated
+        return reported.timestamp()
+
+    @staticmethod
+    def _compile_layout(layout):
+        """Parse a radar layout once per plan; None when it cannot be projected."""
         try:
-            x_val = point['x']
-            y_val = point['y']
-            
-            enable_3d = layout.get('enable_3d', False)
-            ceiling_mount = layout.get('ceiling_mount', False)
+            ground = bool(layout.get('enable_3d', False)) and not layout.get('ceiling_mount', False)
+            rot = float(layout.get('rotation', 0))
+            base_rad = (rot - 90) * math.pi / 180.0
+            return (
+                ground,
+                float(layout.get('mount_height', 2.5)) if ground else 0.0,
+                bool(layout.get('mirror_x', False)),
+                float(layout.get('origin_x', 50)),
+                float(layout.get('origin_y', 50)),
+                float(layout.get('scale_x', 5)),
+                float(layout.get('scale_y', 5)),
+                math.cos(base_rad), math.sin(base_rad),
+                math.cos(base_rad + (math.pi / 2)), math.sin(base_rad + (math.pi / 2)),
+            )
+        except (TypeError, ValueError):
+            return None
 
-            if enable_3d and not ceiling_mount and y_val > 0:
-                radar_h = float(layout.get('mount_height', 2.5))
-                h_diff = abs(radar_h - target_h_m)
-                
-                x_m = x_val / 1000.0; y_m = y_val / 1000.0
-                slant_dist = math.sqrt(x_m**2 + y_m**2)
-                
-                if slant_dist > h_diff:
-                    ground_dist = math.sqrt(slant_dist**2 - h_diff**2)
-                    scale_k = ground_dist / slant_dist
-                    x_val *= scale_k; y_val *= scale_k
-                else:
-                    x_val = 0; y_val = 0
+    @staticmethod
+    def _project(projection, point, target_h_m=1.5):
+        ground, radar_h, mirror_x, ox, oy, sx, sy, y_vec_x, y_vec_y, x_vec_x, x_vec_y = projection
+        x_val = point['x']
+        y_val = point['y']
 
-            xm = x_val / 1000.0
-            ym = y_val / 1000.0
-            if layout.get('mirror_x', False): xm = -xm
+        if ground and y_val > 0:
+            h_diff = abs(radar_h - target_h_m)
 
-            ox = float(layout.get('origin_x', 50))
-            oy = float(layout.get('origin_y', 50))
-            sx = float(layout.get('scale_x', 5))
-            sy = float(layout.get('scale_y', 5))
-            rot = float(layout.get('rotation', 0))
+            x_m = x_val / 1000.0; y_m = y_val / 1000.0
+            slant_dist = math.sqrt(x_m**2 + y_m**2)
 
-            base_rad = (rot - 90) * math.pi / 180.0
-            y_vec_x = math.cos(base_rad); y_vec_y = math.sin(base_rad)
-            x_vec_x = math.cos(base_rad + (math.pi / 2)); x_vec_y = math.sin(base_rad + (math.pi / 2))
+            if slant_dist > h_diff:
+                ground_dist = math.sqrt(slant_dist**2 - h_diff**2)
+                scale_k = ground_dist / slant_dist
+                x_val *= scale_k; y_val *= scale_k
+            else:
+                x_val = 0; y_val = 0
 
-            final_x = ox + (xm * sx * x_vec_x) + (ym * sy * y_vec_x)
-            final_y = oy + (xm * sx * x_vec_y) + (ym * sy * y_vec_y)
+        xm = x_val / 1000.0
+        ym = y_val / 1000.0
+        if mirror_x: xm = -xm
 
-            return {'left': final_x, 'top': final_y, 'active': True}
-        except Exception as e:
-            return None
+        final_x = ox + (xm * sx * x_vec_x) + (ym * sy * y_vec_x)
+        final_y = oy + (xm * sx * x_vec_y) + (ym * sy * y_vec_y)
+        return final_x, final_y
 
-    def _cluster_targets(self, points, merge_dist_m=0.8):
+    def _cluster_targets(self, points, merge_dist_m=0.8, precision=2):
         if not points: return []
         
         merge_threshold = merge_dist_m * 5.0 
@@ -231,8 +373,8 @@ class FusionEngine:
             sources = [f"{p['radar']}:{p['raw_id']}" for p in cl]
             results.append({
                 "id": f"target_{idx+1}",
-                "x": round(avg_x, 2), 
-                "y": round(avg_y, 2),
+                "x": round(avg_x, precision), 
+                "y": round(avg_y, precision),
                 "count": len(cl), 
                 "sources": sources
             })
@@ -247,19 +389,3 @@ class FusionEngine:
             "friendly_name": f"RMM {map_id} Master", "icon": "mdi:radar"
         }
         self.hass.states.async_set(entity_id, str(len(targets)), attrs)
-    
-    def _point_in_polygon(self, x, y, poly):
-        n = len(poly)
-        inside = False
-        p1x, p1y = poly[0]
-        for i in range(n + 1):
-            p2x, p2y = poly[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
-        return inside
\ No newline at end of file
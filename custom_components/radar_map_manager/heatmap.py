@@ -0,0 +1,203 @@
+"""Occupancy heatmap accumulator for Radar Map Manager (V1.0.0 Release)."""
+import base64
+import hashlib
+import logging
+import os
+import time
+
+import numpy as np
+
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, HEATMAP_RESOLUTION, HEATMAP_MAX_TICK, HEATMAP_BUCKETS, HEATMAP_DECAY
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_DIR = f"{DOMAIN}_heatmap"
+
+
+class HeatmapGrid:
+    """Dwell seconds per cell, one layer per hour of day and per weekday.
+
+    Each layer is decayed by HEATMAP_DECAY every time its slot comes round again
+    (daily for hour layers, weekly for weekday layers), so old patterns fade out
+    and the totals stay bounded. The stamps hold the hour/day number a layer was
+    last written in.
+    """
+
+    def __init__(self, resolution):
+        self.hourly = np.zeros((HEATMAP_BUCKETS["hourly"], resolution, resolution), dtype=np.float64)
+        self.daily = np.zeros((HEATMAP_BUCKETS["daily"], resolution, resolution), dtype=np.float64)
+        self.hourly_stamp = np.full(HEATMAP_BUCKETS["hourly"], -1, dtype=np.int64)
+        self.daily_stamp = np.full(HEATMAP_BUCKETS["daily"], -1, dtype=np.int64)
+        self.dirty = False
+
+    def roll(self, hour, weekday, epoch_hour, epoch_day):
+        _decay(self.hourly, self.hourly_stamp, hour, epoch_hour, HEATMAP_BUCKETS["hourly"])
+        _decay(self.daily, self.daily_stamp, weekday, epoch_day, HEATMAP_BUCKETS["daily"])
+
+
+def _decay(layers, stamps, index, stamp, period):
+    last = stamps[index]
+    if last == stamp: return
+    if last >= 0:
+        layers[index] *= HEATMAP_DECAY ** max(1, (stamp - last) // period)
+    stamps[index] = stamp
+
+
+class OccupancyHeatmap:
+    def __init__(self, hass, resolution=HEATMAP_RESOLUTION):
+        self.hass = hass
+        self.resolution = resolution
+        self._grids = {}
+        self._last_tick = None
+        self._legacy = {}
+        self._dir = hass.config.path(".storage", STORAGE_DIR)
+
+    def _grid(self, map_group):
+        grid = self._grids.get(map_group)
+        if grid is None:
+            grid = self._grids[map_group] = HeatmapGrid(self.resolution)
+        return grid
+
+    def accumulate(self, targets_by_map, now=None):
+        tick = time.monotonic()
+        if self._last_tick is None:
+            self._last_tick = tick
+            return
+        dt = min(tick - self._last_tick, HEATMAP_MAX_TICK)
+        self._last_tick = tick
+        if dt <= 0: return
+
+        local = now or dt_util.now()
+        hour, weekday = local.hour, local.weekday()
+        epoch_day = local.date().toordinal()
+        epoch_hour = epoch_day * 24 + hour
+        res = self.resolution
+
+        for map_group, targets in targets_by_map.items():
+            if not targets: continue
+
+            n = len(targets)
+            xs = np.fromiter((t["x"] for t in targets), dtype=np.float32, count=n)
+            ys = np.fromiter((t["y"] for t in targets), dtype=np.float32, count=n)
+            on_map = (xs >= 0) & (xs < 100) & (ys >= 0) & (ys < 100)
+            if not on_map.any(): continue
+
+            cx = (xs[on_map] * (res / 100.0)).astype(np.intp)
+            cy = (ys[on_map] * (res / 100.0)).astype(np.intp)
+
+            grid = self._grid(map_group)
+            grid.roll(hour, weekday, epoch_hour, epoch_day)
+            np.add.at(grid.hourly[hour], (cy, cx), dt)
+            np.add.at(grid.daily[weekday], (cy, cx), dt)
+            grid.dirty = True
+
+    def snapshot(self, map_group, bucket="daily", index=None):
+        if bucket not in HEATMAP_BUCKETS:
+            raise ValueError(f"Unknown heatmap bucket: {bucket}")
+        if index is not None and not 0 <= index < HEATMAP_BUCKETS[bucket]:
+            raise ValueError(f"Bucket index out of range: {index}")
+
+        grid = self._grids.get(map_group)
+        if grid is None:
+            for key, value in self._grids.items():
+                if key.lower() == str(map_group).lower():
+                    grid = value
+                    break
+
+        res = self.resolution
+        if grid is None:
+            data = np.zeros((res, res), dtype=np.float64)
+        else:
+            layers = getattr(grid, bucket)
+            data = layers[index] if index is not None else layers.sum(axis=0)
+
+        peak = float(data.max())
+        if peak > 0:
+            scaled = np.rint(data * (255.0 / peak)).astype(np.uint8)
+        else:
+            scaled = np.zeros((res, res), dtype=np.uint8)
+
+        return {
+            "map_group": map_group,
+            "bucket": bucket,
+            "index": index,
+            "resolution": res,
+            "max_seconds": round(peak, 1),
+            "total_seconds": round(float(data.sum()), 1),
+            "grid": base64.b64encode(scaled.tobytes()).decode("ascii"),
+        }
+
+    async def async_load(self):
+        grids = await self.hass.async_add_executor_job(self._read)
+        self._grids.update(grids)
+        if grids:
+            _LOGGER.info(f"RMM: Heatmap loaded for {len(grids)} map group(s).")
+
+    async def async_flush(self, *_):
+        snapshots = {}
+        for map_group, grid in self._grids.items():
+            if grid.dirty:
+                snapshots[map_group] = (
+                    grid.hourly.copy(), grid.daily.copy(), grid.hourly_stamp.copy(), grid.daily_stamp.copy()
+                )
+                grid.dirty = False
+        if snapshots:
+            await self.hass.async_add_executor_job(self._write, snapshots)
+
+    def _path(self, map_group):
+        # Names that slugify alike ("Floor 1" / "floor-1") get distinct files.
+        digest = hashlib.sha1(str(map_group).encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self._dir, f"{slugify(map_group) or 'default'}_{digest}.npz")
+
+    def _write(self, snapshots):
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            for map_group, (hourly, daily, hourly_stamp, daily_stamp) in snapshots.items():
+                path = self._path(map_group)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.savez_compressed(
+                        f, hourly=hourly, daily=daily, hourly_stamp=hourly_stamp,
+                        daily_stamp=daily_stamp, map_group=np.array(map_group),
+                    )
+                os.replace(tmp_path, path)
+
+                legacy = self._legacy.pop(map_group, None)
+                if legacy and os.path.exists(legacy):
+                    os.remove(legacy)
+        except OSError as e:
+            _LOGGER.error(f"RMM: Heatmap flush failed: {e}")
+
+    def _read(self):
+        grids = {}
+        if not os.path.isdir(self._dir):
+            return grids
+        for filename in sorted(os.listdir(self._dir)):
+            if not filename.endswith(".npz"): continue
+            path = os.path.join(self._dir, filename)
+            try:
+                with np.load(path) as npz:
+                    map_group = str(npz["map_group"])
+                    if path != self._path(map_group):
+                        # Pre-hash file name; rewritten under the new name on the next flush.
+                        self._legacy[map_group] = path
+                        if map_group in grids:
+                            grids[map_group].dirty = True
+                            continue
+
+                    grid = HeatmapGrid(self.resolution)
+                    if npz["hourly"].shape != grid.hourly.shape or npz["daily"].shape != grid.daily.shape:
+                        _LOGGER.warning(f"RMM: Discarding heatmap {filename} with mismatched resolution.")
+                        continue
+                    grid.hourly[:] = npz["hourly"]
+                    grid.daily[:] = npz["daily"]
+                    if "hourly_stamp" in npz.files:
+                        grid.hourly_stamp[:] = npz["hourly_stamp"]
+                        grid.daily_stamp[:] = npz["daily_stamp"]
+                    grid.dirty = map_group in self._legacy
+                    grids[map_group] = grid
+            except Exception as e:
+                _LOGGER.error(f"RMM: Failed to load heatmap {filename}: {e}")
+        return grids
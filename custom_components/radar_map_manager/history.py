@@ -0,0 +1,95 @@
+"""Short-term fused frame history for Radar Map Manager (V1.0.0 Release)."""
+import logging
+import math
+import time
+
+import numpy as np
+
+from .const import HISTORY_DEFAULT_SECONDS, HISTORY_MAX_FRAMES, HISTORY_MAX_TARGETS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FrameRing:
+    """Fixed-capacity ring of fused frames stored as flat NumPy arrays."""
+
+    def __init__(self, capacity, max_targets=HISTORY_MAX_TARGETS):
+        self.capacity = capacity
+        self.max_targets = max_targets
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.counts = np.zeros(capacity, dtype=np.uint8)
+        self.xy = np.zeros((capacity, max_targets, 2), dtype=np.float32)
+        self.head = 0
+        self.size = 0
+
+    def push(self, ts, targets):
+        i = self.head
+        n = min(len(targets), self.max_targets)
+        self.ts[i] = ts
+        self.counts[i] = n
+        if n:
+            self.xy[i, :n] = [(t["x"], t["y"]) for t in targets[:n]]
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def window(self, since):
+        """Ring indices of frames newer than `since`, oldest first."""
+        order = (np.arange(self.size) + self.head - self.size) % self.capacity
+        return order[self.ts[order] >= since]
+
+
+class FrameHistory:
+    def __init__(self, coordinator):
+        self._coordinator = coordinator
+        self._rings = {}
+        self._capacity = 0
+        self._revision = None
+
+    def _configure(self):
+        global_config = self._coordinator.model.global_config
+        interval = max(0.1, float(global_config.get("update_interval", 0.1)))
+        frames = int(global_config.get("history_frames") or 0)
+        if frames <= 0:
+            seconds = float(global_config.get("history_seconds", HISTORY_DEFAULT_SECONDS))
+            frames = math.ceil(seconds / interval)
+        capacity = max(1, min(frames, HISTORY_MAX_FRAMES))
+
+        if capacity != self._capacity:
+            _LOGGER.debug(f"RMM: Frame history capacity set to {capacity} frames.")
+            self._capacity = capacity
+            self._rings = {}
+        self._revision = self._coordinator.revision
+
+    def record(self, targets_by_map, ts=None):
+        if self._revision != self._coordinator.revision:
+            self._configure()
+        ts = time.monotonic() if ts is None else ts
+        for map_group, targets in targets_by_map.items():
+            ring = self._rings.get(map_group)
+            if ring is None:
+                ring = self._rings[map_group] = FrameRing(self._capacity)
+            ring.push(ts, targets)
+
+    def query(self, map_group, seconds, max_frames=None):
+        now = time.monotonic()
+        ring = self._rings.get(map_group)
+        if ring is None:
+            for key, value in self._rings.items():
+                if key.lower() == str(map_group).lower():
+                    ring = value
+                    break
+
+        frames = []
+        if ring is not None:
+            sel = ring.window(now - seconds)
+            if max_frames and len(sel) > max_frames:
+                picks = np.unique(np.linspace(0, len(sel) - 1, max_frames).round().astype(np.intp))
+                sel = sel[picks]
+            for i in sel:
+                n = int(ring.counts[i])
+                frames.append([
+                    round(float(ring.ts[i] - now), 2),
+                    np.round(ring.xy[i, :n], 2).ravel().tolist(),
+                ])
+
+        return {"map_group": map_group, "seconds": seconds, "frames": frames}
@@ -0,0 +1,84 @@
+"""Input-to-publication latency tracking for Radar Map Manager (V1.0.0 Release)."""
+import bisect
+
+from .const import LATENCY_BUCKETS
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of seconds, cumulative since start."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.stale = 0
+
+    def add(self, seconds):
+        if seconds < 0: seconds = 0.0
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th sample (max for the overflow bucket)."""
+        if not self.count: return None
+        rank = q * self.count
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.bounds[idx] if idx < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "max": round(self.max, 4),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "stale_dropped": self.stale,
+        }
+
+
+class LatencyTracker:
+    """Per-radar histograms fed once per input state change, not once per tick."""
+
+    def __init__(self):
+        self.radars = {}
+        self._seen = {}
+
+    def observe(self, radar, slot, changed_at, published_at):
+        key = (radar, slot)
+        if self._seen.get(key) == changed_at: return
+        self._seen[key] = changed_at
+        self._histogram(radar).add(published_at - changed_at)
+
+    def drop_stale(self, radar, slot, changed_at):
+        key = (radar, slot)
+        if self._seen.get(key) == changed_at: return
+        self._seen[key] = changed_at
+        self._histogram(radar).stale += 1
+
+    def prune(self, radar_names):
+        for name in list(self.radars):
+            if name not in radar_names:
+                del self.radars[name]
+        self._seen = {k: v for k, v in self._seen.items() if k[0] in radar_names}
+
+    def snapshot(self, radar=None):
+        if radar is not None:
+            hist = self.radars.get(radar)
+            return {radar: hist.as_dict()} if hist else {}
+        return {name: hist.as_dict() for name, hist in self.radars.items()}
+
+    def _histogram(self, radar):
+        hist = self.radars.get(radar)
+        if hist is None:
+            hist = self.radars[radar] = LatencyHistogram()
+        return hist
@@ -0,0 +1,101 @@
+"""Tick budget and load shedding for Radar Map Manager (V1.0.0 Release)."""
+import logging
+import math
+from collections import deque
+
+from .const import (
+    LOAD_BUDGET_FRACTION,
+    LOAD_WINDOW,
+    LOAD_RECOVER_FRACTION,
+    LOAD_MAX_LEVEL,
+    LOAD_COOLDOWN_WINDOWS,
+    LOAD_COOLDOWN_MAX_WINDOWS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+LEVEL_NAMES = {
+    0: "normal",
+    1: "idle maps throttled",
+    2: "idle radars reuse last pass",
+    3: "reduced precision",
+}
+
+
+class LoadShedder:
+    """Steps the degradation level up when the rolling p95 tick time exceeds the budget.
+
+    The budget is a fraction of `update_interval`. Every level change clears the
+    window, so each decision is based on a full window measured at the current level.
+    Each step up remembers the p95 that triggered it; the first full window at the
+    new level gives the fraction of that cost the step keeps. Recovery is judged on
+    the estimated cost without the step (current p95 scaled back up by that fraction),
+    and only after a cool-down that doubles whenever a step down is undone within
+    twice its length.
+    """
+
+    def __init__(self):
+        self.level = 0
+        self.budget = 0.0
+        self.p95 = 0.0
+        self._samples = deque(maxlen=LOAD_WINDOW)
+        self._steps = []
+        self._ticks = 0
+        self._since_down = None
+        self._cooldown = LOAD_COOLDOWN_WINDOWS
+
+    def configure(self, update_interval):
+        self.budget = max(0.1, float(update_interval)) * LOAD_BUDGET_FRACTION
+
+    def record(self, seconds) -> bool:
+        """Add one tick duration; returns True when the level changed."""
+        self._samples.append(seconds)
+        self._ticks += 1
+        if self._since_down is not None:
+            self._since_down += 1
+        if len(self._samples) < LOAD_WINDOW:
+            return False
+
+        ordered = sorted(self._samples)
+        self.p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+        if self._steps and self._steps[-1][1] is None:
+            self._steps[-1][1] = min(1.0, self.p95 / self._steps[-1][0])
+
+        if self.p95 > self.budget and self.level < LOAD_MAX_LEVEL:
+            if self._since_down is not None and self._since_down < 2 * self._cooldown * LOAD_WINDOW:
+                self._cooldown = min(self._cooldown * 2, LOAD_COOLDOWN_MAX_WINDOWS)
+            self._steps.append([self.p95, None])
+            self._set_level(self.level + 1)
+            return True
+
+        if self.level > 0 and self._ticks >= self._cooldown * LOAD_WINDOW:
+            if self.p95 / max(self._steps[-1][1], 0.05) < self.budget * LOAD_RECOVER_FRACTION:
+                self._steps.pop()
+                self._since_down = 0
+                self._set_level(self.level - 1)
+                return True
+
+        if self._since_down is not None and self._since_down >= LOAD_COOLDOWN_MAX_WINDOWS * LOAD_WINDOW:
+            self._cooldown = LOAD_COOLDOWN_WINDOWS
+            self._since_down = None
+        return False
+
+    def _set_level(self, level):
+        log = _LOGGER.warning if level > self.level else _LOGGER.info
+        log(
+            f"RMM: Load level {self.level} -> {level} ({LEVEL_NAMES[level]}): "
+            f"p95 tick {self.p95 * 1000:.1f} ms, budget {self.budget * 1000:.1f} ms."
+        )
+        self.level = level
+        self._samples.clear()
+        self._ticks = 0
+
+    def as_dict(self):
+        return {
+            "load_level": self.level,
+            "load_state": LEVEL_NAMES[self.level],
+            "tick_p95_ms": round(self.p95 * 1000, 2),
+            "tick_budget_ms": round(self.budget * 1000, 2),
+            "tick_samples": len(self._samples),
+            "recover_after_ticks": max(0, self._cooldown * LOAD_WINDOW - self._ticks) if self.level else 0,
+        }
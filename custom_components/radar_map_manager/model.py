@@ -0,0 +1,440 @@
+"""Typed configuration model for Radar Map Manager (V1.0.0 Release)."""
+import math
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Optional
+
+from homeassistant.util import slugify
+
+DATA_VERSION = 1
+DEFAULT_MAP = "default"
+MAP_ZONE_TYPES = ("include_zones", "exclude_zones")
+RADAR_ZONE_TYPES = ("monitor_zones",)
+
+DEFAULT_GLOBAL_CONFIG = {
+    "update_interval": 0.1,
+    "merge_distance": 0.8,
+    "target_height": 1.5,
+    "fused_color": "#FFD700",
+    "history_seconds": 30,
+    "history_frames": 0,
+    "zone_hysteresis": 1.0,
+    "zone_min_dwell": 0.5,
+    "zone_entities": "per_zone",
+    "max_point_age": 0,
+    "zone_simplify_tolerance": 0.0,
+    "zone_max_vertices": 0,
+}
+DEFAULT_LAYOUT = {"origin_x": 50, "origin_y": 50, "scale_x": 5, "scale_y": 5, "rotation": 0}
+
+
+@dataclass(frozen=True)
+class Polygon:
+    """Zone outline compiled into flat coordinate tuples with a bounding box."""
+    xs: tuple
+    ys: tuple
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+    @classmethod
+    def compile(cls, points) -> Optional["Polygon"]:
+        if not points or len(points) < 3:
+            return None
+        xs, ys = [], []
+        try:
+            for p in points:
+                if isinstance(p, (list, tuple)):
+                    xs.append(float(p[0])); ys.append(float(p[1]))
+                else:
+                    xs.append(float(p.get('x', 0))); ys.append(float(p.get('y', 0)))
+        except (TypeError, ValueError, IndexError, AttributeError):
+            return None
+        return cls(tuple(xs), tuple(ys), min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, x, y) -> bool:
+        if x < self.min_x or x > self.max_x or y < self.min_y or y > self.max_y:
+            return False
+        xs, ys = self.xs, self.ys
+        inside = False
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            yi, yj = ys[i], ys[j]
+            if (yi > y) != (yj > y):
+                xi = xs[i]
+                if x < (xs[j] - xi) * (y - yi) / (yj - yi) + xi:
+                    inside = not inside
+            j = i
+        return inside
+
+    def covers(self, x, y) -> bool:
+        """Edge-inclusive test the fusion engine has always used for exclude and monitor zones.
+
+        Unlike `contains` (the zone sensors' rule), points on a top or right edge count as inside.
+        """
+        if x < self.min_x or x > self.max_x or y < self.min_y or y > self.max_y:
+            return False
+        xs, ys = self.xs, self.ys
+        inside = False
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            y1, y2 = ys[j], ys[i]
+            if min(y1, y2) < y <= max(y1, y2):
+                x1, x2 = xs[j], xs[i]
+                if x <= max(x1, x2) and (x1 == x2 or x <= (y - y1) * (x2 - x1) / (y2 - y1) + x1):
+                    inside = not inside
+            j = i
+        return inside
+
+    def distance_to_edge(self, x, y) -> float:
+        xs, ys = self.xs, self.ys
+        best = math.inf
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            ax, ay = xs[j], ys[j]
+            dx, dy = xs[i] - ax, ys[i] - ay
+            l2 = dx * dx + dy * dy
+            t = 0.0 if l2 == 0 else max(0.0, min(1.0, ((x - ax) * dx + (y - ay) * dy) / l2))
+            ex, ey = ax + t * dx - x, ay + t * dy - y
+            d2 = ex * ex + ey * ey
+            if d2 < best:
+                best = d2
+            j = i
+        return math.sqrt(best)
+
+
+def _point_xy(p):
+    if isinstance(p, (list, tuple)):
+        return float(p[0]), float(p[1])
+    return float(p.get('x', 0)), float(p.get('y', 0))
+
+
+def _segment_distance(px, py, ax, ay, bx, by) -> float:
+    dx, dy = bx - ax, by - ay
+    l2 = dx * dx + dy * dy
+    t = 0.0 if l2 == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / l2))
+    return math.hypot(ax + t * dx - px, ay + t * dy - py)
+
+
+def simplify_polygon(points, tolerance=0.0, max_vertices=0) -> list:
+    """Douglas-Peucker on a closed ring, in map-percent units, with an optional vertex cap.
+
+    Every vertex gets the deviation at which DP would keep it, capped by its
+    parent's, so keeping the highest-ranked vertices is the same as running DP
+    with a larger tolerance. Returns a subset of `points` in their original form.
+    """
+    n = len(points)
+    if n <= 3 or (tolerance <= 0 and (max_vertices <= 0 or n <= max_vertices)):
+        return list(points)
+    try:
+        xy = [_point_xy(p) for p in points]
+    except (TypeError, ValueError, IndexError, AttributeError):
+        return list(points)
+
+    x0, y0 = xy[0]
+    far = max(range(n), key=lambda i: (xy[i][0] - x0) ** 2 + (xy[i][1] - y0) ** 2)
+    rank = [0.0] * n
+    rank[0] = rank[far] = math.inf
+
+    stack = [(0, far, math.inf), (far, n, math.inf)]
+    while stack:
+        a, b, cap = stack.pop()
+        if b - a < 2: continue
+        (ax, ay), (bx, by) = xy[a], xy[b % n]
+        best, idx = -1.0, a + 1
+        for i in range(a + 1, b):
+            d = _segment_distance(xy[i][0], xy[i][1], ax, ay, bx, by)
+            if d > best:
+                best, idx = d, i
+        rank[idx] = min(best, cap)
+        stack.append((a, idx, rank[idx]))
+        stack.append((idx, b, rank[idx]))
+
+    keep = [i for i in range(n) if rank[i] > tolerance]
+    limit = max(3, max_vertices) if max_vertices > 0 else n
+    if len(keep) > limit or len(keep) < 3:
+        keep = sorted(sorted(range(n), key=lambda i: -rank[i])[:min(limit, max(3, len(keep)))])
+    return [points[i] for i in keep]
+
+
+@dataclass
+class Zone:
+    name: Optional[str]
+    points: list
+    delay: float = 0.0
+    extra: dict = field(default_factory=dict)
+
+    @cached_property
+    def polygon(self) -> Optional[Polygon]:
+        """Compiled on first use, so zones that are only loaded, compared or stored never compile."""
+        return Polygon.compile(self.points)
+
+    @property
+    def slug(self) -> str:
+        return slugify(self.name or "")
+
+    def label(self, zone_type, idx) -> str:
+        """Name the zone's entities and events use; unnamed zones fall back to their list position."""
+        return self.name or f"{zone_type}_{idx}"
+
+    def simplified(self, tolerance=0.0, max_vertices=0) -> "Zone":
+        points = simplify_polygon(self.points, tolerance, max_vertices)
+        if len(points) == len(self.points):
+            return self
+        return Zone(name=self.name, points=points, delay=self.delay, extra=dict(self.extra))
+
+    @classmethod
+    def from_dict(cls, raw) -> "Zone":
+        if isinstance(raw, (list, tuple)):
+            return cls(name=None, points=list(raw))
+        raw = dict(raw or {})
+        name = raw.pop("name", None)
+        points = raw.pop("points", []) or []
+        try:
+            delay = float(raw.pop("delay", 0) or 0)
+        except (TypeError, ValueError):
+            delay = 0.0
+        return cls(name=name, points=list(points), delay=delay, extra=raw)
+
+    def to_dict(self) -> dict:
+        out = dict(self.extra)
+        if self.name is not None:
+            out["name"] = self.name
+        out["points"] = self.points
+        out["delay"] = self.delay
+        return out
+
+
+@dataclass
+class MapGroup:
+    map_id: str
+    include_zones: list = field(default_factory=list)
+    exclude_zones: list = field(default_factory=list)
+    extra: dict = field(default_factory=dict)
+
+    def zones(self, zone_type) -> list:
+        return self.include_zones if zone_type == "include_zones" else self.exclude_zones
+
+    @classmethod
+    def from_dict(cls, map_id, raw) -> "MapGroup":
+        raw = dict(raw or {})
+        raw.pop("targets", None)
+        zones = raw.pop("zones", None) or {}
+        return cls(
+            map_id=map_id,
+            include_zones=[Zone.from_dict(z) for z in zones.get("include_zones", []) or []],
+            exclude_zones=[Zone.from_dict(z) for z in zones.get("exclude_zones", []) or []],
+            extra=raw,
+        )
+
+    def to_dict(self) -> dict:
+        out = dict(self.extra)
+        out["zones"] = {
+            "include_zones": [z.to_dict() for z in self.include_zones],
+            "exclude_zones": [z.to_dict() for z in self.exclude_zones],
+        }
+        return out
+
+
+@dataclass
+class Radar:
+    name: str
+    map_group: str = DEFAULT_MAP
+    layout: dict = field(default_factory=lambda: dict(DEFAULT_LAYOUT))
+    monitor_zones: list = field(default_factory=list)
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, name, raw) -> "Radar":
+        raw = dict(raw or {})
+        return cls(
+            name=name,
+            map_group=raw.pop("map_group", DEFAULT_MAP) or DEFAULT_MAP,
+            layout=dict(raw.pop("layout", None) or {}),
+            monitor_zones=[Zone.from_dict(z) for z in raw.pop("monitor_zones", []) or []],
+            extra=raw,
+        )
+
+    def to_dict(self) -> dict:
+        out = dict(self.extra)
+        out["map_group"] = self.map_group
+        out["layout"] = self.layout
+        out["monitor_zones"] = [z.to_dict() for z in self.monitor_zones]
+        return out
+
+
+class ConfigModel:
+    """In-memory configuration with lookup indexes rebuilt on every change."""
+
+    def __init__(self, version=DATA_VERSION, global_config=None, maps=None, radars=None, extra=None):
+        self.version = version
+        self.global_config = dict(DEFAULT_GLOBAL_CONFIG)
+        self.global_config.update(global_config or {})
+        self.maps = maps or {}
+        self.radars = radars or {}
+        self.extra = extra or {}
+        self.ensure_map(DEFAULT_MAP)
+        self.reindex()
+
+    @classmethod
+    def from_dict(cls, raw) -> "ConfigModel":
+        raw = dict(raw or {})
+        version = raw.pop("version", DATA_VERSION)
+        global_config = raw.pop("global_config", None) or {}
+        maps = {m: MapGroup.from_dict(m, d) for m, d in (raw.pop("maps", None) or {}).items()}
+        radars = {r: Radar.from_dict(r, d) for r, d in (raw.pop("radars", None) or {}).items()}
+        return cls(version, global_config, maps, radars, raw)
+
+    def to_dict(self) -> dict:
+        out = dict(self.extra)
+        out["version"] = self.version
+        out["global_config"] = dict(self.global_config)
+        out["maps"] = {m: g.to_dict() for m, g in self.maps.items()}
+        out["radars"] = {r: rd.to_dict() for r, rd in self.radars.items()}
+        return out
+
+    def ensure_map(self, map_id) -> MapGroup:
+        group = self.maps.get(map_id)
+        if group is None:
+            group = self.maps[map_id] = MapGroup(map_id)
+        return group
+
+    def reindex(self):
+        self.radars_by_map = {}
+        for radar in self.radars.values():
+            self.radars_by_map.setdefault(radar.map_group, []).append(radar)
+
+        self.zone_index = {}
+        for map_id, group in self.maps.items():
+            for zone_type in MAP_ZONE_TYPES:
+                self.zone_index[(map_id, zone_type)] = _zone_positions(group.zones(zone_type))
+        self._compiled = {}
+
+        self._map_keys = {}
+        for map_id in self.maps:
+            self._map_keys.setdefault(map_id.lower(), map_id)
+
+    def resolve_map_id(self, name) -> Optional[str]:
+        if name in self.maps:
+            return name
+        return self._map_keys.get(str(name).lower())
+
+    def compiled_zones(self, map_id, zone_type) -> list:
+        key = (map_id, zone_type)
+        polygons = self._compiled.get(key)
+        if polygons is None:
+            group = self.maps.get(map_id)
+            zones = group.zones(zone_type) if group is not None else []
+            polygons = self._compiled[key] = [z.polygon for z in zones if z.polygon is not None]
+        return polygons
+
+
+@dataclass
+class ConfigDiff:
+    """What changed between two models; zone keys are (map_id, zone_type, slug).
+
+    A slug of None marks a zone list that could not be matched by name
+    (unnamed or duplicate zones) and has to be treated as replaced wholesale.
+    """
+    full: bool = False
+    maps_added: set = field(default_factory=set)
+    maps_removed: set = field(default_factory=set)
+    radars_added: set = field(default_factory=set)
+    radars_removed: set = field(default_factory=set)
+    radars_changed: set = field(default_factory=set)
+    radar_maps: set = field(default_factory=set)
+    zones_added: set = field(default_factory=set)
+    zones_removed: set = field(default_factory=set)
+    zones_changed: set = field(default_factory=set)
+    global_changed: set = field(default_factory=set)
+
+    def __bool__(self):
+        return self.full or bool(
+            self.maps_added or self.maps_removed or self.radar_maps
+            or self.zones_added or self.zones_removed or self.zones_changed
+            or self.global_changed
+        )
+
+    def merge(self, other) -> "ConfigDiff":
+        merged = ConfigDiff(full=self.full or other.full)
+        for f in ("maps_added", "maps_removed", "radars_added", "radars_removed", "radars_changed",
+                  "radar_maps", "zones_added", "zones_removed", "zones_changed", "global_changed"):
+            setattr(merged, f, getattr(self, f) | getattr(other, f))
+        return merged
+
+    def zone_maps(self, zone_type) -> set:
+        maps = self.maps_added | self.maps_removed
+        for keys in (self.zones_added, self.zones_removed, self.zones_changed):
+            maps.update(m for m, t, _ in keys if t == zone_type)
+        return maps
+
+    def fusion_maps(self) -> set:
+        return self.radar_maps | self.zone_maps("exclude_zones")
+
+
+def _zone_positions(zones) -> Optional[dict]:
+    """Slug -> list position; None when a zone is unnamed or two zones share a slug."""
+    index = {}
+    for idx, zone in enumerate(zones):
+        if not zone.name or zone.slug in index:
+            return None
+        index[zone.slug] = idx
+    return index
+
+
+def diff_models(old: ConfigModel, new: ConfigModel) -> ConfigDiff:
+    """Compare two models and hand unchanged zones and radars of `old` over to `new`.
+
+    Polygons compile lazily, so comparing here compiles nothing; reusing the old
+    objects keeps the polygons they already compiled, so only edited geometry
+    compiles again and identity checks downstream stay cheap.
+    """
+    diff = ConfigDiff()
+    diff.global_changed = {
+        k for k in old.global_config.keys() | new.global_config.keys()
+        if old.global_config.get(k) != new.global_config.get(k)
+    }
+    diff.maps_added = new.maps.keys() - old.maps.keys()
+    diff.maps_removed = old.maps.keys() - new.maps.keys()
+
+    for map_id in old.maps.keys() & new.maps.keys():
+        old_group, new_group = old.maps[map_id], new.maps[map_id]
+        for zone_type in MAP_ZONE_TYPES:
+            old_zones, new_zones = old_group.zones(zone_type), new_group.zones(zone_type)
+            old_index = old.zone_index.get((map_id, zone_type))
+            new_index = new.zone_index.get((map_id, zone_type))
+
+            if old_index is None or new_index is None:
+                if old_zones != new_zones:
+                    diff.zones_changed.add((map_id, zone_type, None))
+                continue
+
+            for idx, zone in enumerate(new_zones):
+                pos = old_index.get(zone.slug)
+                previous = old_zones[pos] if pos is not None else None
+                if previous is None:
+                    diff.zones_added.add((map_id, zone_type, zone.slug))
+                elif previous != zone:
+                    diff.zones_changed.add((map_id, zone_type, zone.slug))
+                else:
+                    new_zones[idx] = previous
+            for slug in old_index.keys() - new_index.keys():
+                diff.zones_removed.add((map_id, zone_type, slug))
+
+    for name, radar in new.radars.items():
+        previous = old.radars.get(name)
+        if previous is None:
+            diff.radars_added.add(name)
+            diff.radar_maps.add(radar.map_group)
+        elif previous != radar:
+            diff.radars_changed.add(name)
+            diff.radar_maps.update((previous.map_group, radar.map_group))
+        else:
+            new.radars[name] = previous
+    for name in old.radars.keys() - new.radars.keys():
+        diff.radars_removed.add(name)
+        diff.radar_maps.add(old.radars[name].map_group)
+
+    new.reindex()
+    return diff
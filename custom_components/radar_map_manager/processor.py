@@ -4,14 +4,24 @@ import json
 import time
 from homeassistant.core import HomeAssistant
 from .fusion_engine import FusionEngine
+from .events import ZoneEventEngine
+from .load_shedding import LoadShedder
 
 _LOGGER = logging.getLogger(__name__)
 
 class RadarProcessor:
-    def __init__(self, hass: HomeAssistant, coordinator):
+    def __init__(self, hass: HomeAssistant, coordinator, heatmap=None, history=None, zone_stats=None):
         self.hass = hass
         self._coordinator = coordinator
+        self._heatmap = heatmap
+        self._history = history
+        self._zone_stats = zone_stats
         self._fusion_engine = FusionEngine(hass, coordinator)
+        self.latency = self._fusion_engine.latency
+        self.raw_points = self._fusion_engine.raw_points
+        self._zone_events = ZoneEventEngine(hass, coordinator)
+        self.load = LoadShedder()
+        self._published_revision = None
 
     async def async_start(self):
         _LOGGER.debug("RMM: Processor started.")
@@ -20,16 +30,36 @@ class RadarProcessor:
         _LOGGER.debug("RMM: Processor stopped.")
 
     async def update(self, now=None, force=False):
+        started = time.perf_counter()
+        if self._published_revision != self._coordinator.revision:
+            self.load.configure(self._coordinator.model.global_config.get("update_interval", 0.1))
+
+        self._fusion_engine.level = self.load.level
         self._fusion_engine.update()
+        self._zone_events.process(self._coordinator.targets)
+
+        if self._heatmap:
+            self._heatmap.accumulate(self._coordinator.targets)
+        if self._history:
+            self._history.record(self._coordinator.targets)
+        if self._zone_stats:
+            self._zone_stats.accumulate(self._coordinator.targets)
 
         if self._coordinator:
             self._coordinator._notify_listeners()
 
         self._update_frontend_sensor()
+        if not force:
+            self.load.record(time.perf_counter() - started)
 
     def _update_frontend_sensor(self):
-        if not self._coordinator.data:
+        if self._coordinator.model is None:
+            return
+
+        revision = self._coordinator.revision
+        if revision == self._published_revision:
             return
+        self._published_revision = revision
 
         data_to_send = self._coordinator.data
         
@@ -39,6 +69,7 @@ class RadarProcessor:
             {
                 "data_json": json.dumps(data_to_send),
                 "last_updated": time.time(),
+                "revision": revision,
                 "version": 1
             }
-        )
\ No newline at end of file
+        )
@@ -1,10 +1,11 @@
 import logging
+import time
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import entity_registry as er
 from homeassistant.util import slugify
-from .const import DOMAIN
+from .const import DOMAIN, ZONE_ENTITIES_PER_ZONE, ZONE_ENTITIES_AGGREGATED
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,42 +24,70 @@ class RadarZoneCountManager:
         self.coordinator = coordinator
         self.async_add_entities = async_add_entities
         self.sensors = {}
+        self._revision = None
 
     @callback
     def update_sensors_callback(self):
+        if self._revision == self.coordinator.revision: return
         self.hass.async_create_task(self.update_sensors())
 
     async def update_sensors(self):
-        data = self.coordinator.data
-        if not data or ('maps' not in data and 'radars' not in data): return
+        model = self.coordinator.model
+        if model is None: return
+
+        # Only map groups whose Detect zones changed are reconciled; None means all of them.
+        diff = self.coordinator.changes_since(self._revision)
+        self._revision = self.coordinator.revision
+        scope = None
+        if diff is not None and not diff.full and "zone_entities" not in diff.global_changed:
+            scope = diff.zone_maps("include_zones")
+            if not scope: return
+
+        mode = model.global_config.get("zone_entities", ZONE_ENTITIES_PER_ZONE)
 
         desired_sensors = {}
-        if 'maps' in data:
-            for map_id, map_data in data['maps'].items():
-                group_slug = slugify(map_id)
-                zones = map_data.get("zones", {})
-                includes = zones.get("include_zones", [])
-                
-                for idx, zone in enumerate(includes):
-                    zone_name = zone.get("name", f"zone_{idx}")
-                    safe_name = slugify(zone_name)
-
-                    uid = f"rmm_{group_slug}_{safe_name}_count"
-                    
-                    desired_sensors[uid] = {
-                        "map_group": map_id,
-                        "zone_name": zone_name,
-                        "points": zone.get("points", [])
-                    }
+        for map_id, group in model.maps.items():
+            if scope is not None and map_id not in scope: continue
+            group_slug = slugify(map_id)
+            zones = []
+
+            for idx, zone in enumerate(group.include_zones):
+                zone_name = zone.name or f"zone_{idx}"
+                safe_name = slugify(zone_name)
+                zones.append((safe_name, zone_name, zone.polygon, zone.delay))
+
+                if mode == ZONE_ENTITIES_AGGREGATED: continue
+
+                uid = f"rmm_{group_slug}_{safe_name}_count"
+
+                desired_sensors[uid] = {
+                    "map_group": map_id,
+                    "zone_name": zone_name,
+                    "points": zone.points,
+                    "polygon": zone.polygon
+                }
+
+            if mode != ZONE_ENTITIES_PER_ZONE:
+                desired_sensors[f"rmm_{group_slug}_zones"] = {
+                    "aggregated": True,
+                    "map_group": map_id,
+                    "zones": zones
+                }
 
         ent_reg = er.async_get(self.hass)
         entries_to_remove = []
-        for entity_id, entry in ent_reg.entities.items():
-            uid_str = str(entry.unique_id)
-            if entry.domain == "sensor" and (entry.platform == DOMAIN or uid_str.startswith("rmm_")):
-                if "_master" in uid_str: continue
-                if uid_str not in desired_sensors:
-                    entries_to_remove.append(entity_id)
+        if scope is None:
+            for entity_id, entry in ent_reg.entities.items():
+                uid_str = str(entry.unique_id)
+                if entry.domain == "sensor" and (entry.platform == DOMAIN or uid_str.startswith("rmm_")):
+                    if "_master" in uid_str: continue
+                    if uid_str not in desired_sensors:
+                        entries_to_remove.append(entity_id)
+        else:
+            for uid, sensor in self.sensors.items():
+                if sensor.config["map_group"] in scope and uid not in desired_sensors:
+                    entity_id = ent_reg.async_get_entity_id("sensor", DOMAIN, uid)
+                    if entity_id: entries_to_remove.append(entity_id)
 
         for entity_id in entries_to_remove:
             ent_reg.async_remove(entity_id)
@@ -69,10 +98,13 @@ class RadarZoneCountManager:
         to_add = []
         for uid, conf in desired_sensors.items():
             if uid not in self.sensors:
-                ent = RadarZoneCountSensor(self.coordinator, uid, conf)
+                if conf.get("aggregated"):
+                    ent = RadarMapZonesSensor(self.coordinator, uid, conf)
+                else:
+                    ent = RadarZoneCountSensor(self.coordinator, uid, conf)
                 self.sensors[uid] = ent
                 to_add.append(ent)
-            else:
+            elif self.sensors[uid].config != conf:
                 self.sensors[uid].update_config(conf)
         
         if to_add:
@@ -90,7 +122,7 @@ class RadarZoneCountSensor(CoordinatorEntity, SensorEntity):
         self.entity_id = f"sensor.{unique_id}"
         self._attr_icon = "mdi:account-group"
         self._map_group = config["map_group"]
-        self._points = config["points"]
+        self._polygon = config["polygon"]
         self._count = 0
 
     @property
@@ -99,40 +131,20 @@ class RadarZoneCountSensor(CoordinatorEntity, SensorEntity):
 
     def update_config(self, new_config):
         self.config = new_config
-        self._points = new_config["points"]
+        self._polygon = new_config["polygon"]
         map_str = new_config["map_group"].replace("_", " ").title()
         self._attr_name = f"RMM {map_str} {new_config['zone_name']} Count"
         self.async_write_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        data = self.coordinator.data or {}
-        
-        maps_data = data.get('maps', {})
-        target_map_data = maps_data.get(self._map_group)
-        if not target_map_data:
-            for k, v in maps_data.items():
-                if k.lower() == self._map_group.lower():
-                    target_map_data = v
-                    break
-        if not target_map_data: return
-
-        fused_targets = target_map_data.get('targets', [])
+        polygon = self._polygon
         count = 0
-        for t in fused_targets:
-            tx, ty = 0.0, 0.0
-            if isinstance(t, dict):
-                tx = float(t.get('x', 0))
-                ty = float(t.get('y', 0))
-            elif isinstance(t, (list, tuple)) and len(t) >= 2:
-                tx = float(t[0])
-                ty = float(t[1])
-            else:
-                continue
+        if polygon is not None:
+            for t in self.coordinator.get_targets(self._map_group):
+                if polygon.contains(float(t.get('x', 0)), float(t.get('y', 0))):
+                    count += 1
 
-            if self._is_point_in_polygon(tx, ty, self._points):
-                count += 1
-        
         if self._count != count:
             self._count = count
             self.async_write_ha_state()
@@ -147,22 +159,60 @@ class RadarZoneCountSensor(CoordinatorEntity, SensorEntity):
             "map_group": self._map_group,
             "zone_name": self.config["zone_name"]
         }
-    
-    def _is_point_in_polygon(self, x, y, poly):
-        if not poly or len(poly) < 3: return False
-        inside = False
-        j = len(poly) - 1
-        for i in range(len(poly)):
-            try:
-                p_i = poly[i]
-                p_j = poly[j]
-                xi = float(p_i[0]) if isinstance(p_i, (list, tuple)) else float(p_i.get('x', 0))
-                yi = float(p_i[1]) if isinstance(p_i, (list, tuple)) else float(p_i.get('y', 0))
-                xj = float(p_j[0]) if isinstance(p_j, (list, tuple)) else float(p_j.get('x', 0))
-                yj = float(p_j[1]) if isinstance(p_j, (list, tuple)) else float(p_j.get('y', 0))
-                
-                intersect = ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi)
-                if intersect: inside = not inside
-                j = i
-            except: return False
-        return inside
\ No newline at end of file
+
+
+class RadarMapZonesSensor(CoordinatorEntity, SensorEntity):
+    """All include zones of one map group in a single entity, written once per pass."""
+
+    def __init__(self, coordinator, unique_id, config):
+        super().__init__(coordinator)
+        self._unique_id = unique_id
+        self.config = config
+        self._attr_has_entity_name = False
+        map_str = config["map_group"].replace("_", " ").title()
+        self._attr_name = f"RMM {map_str} Zones"
+        self.entity_id = f"sensor.{unique_id}"
+        self._attr_icon = "mdi:floor-plan"
+        self._map_group = config["map_group"]
+        self._zones = {}
+        self._last_triggered = {}
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    def update_config(self, new_config):
+        self.config = new_config
+        slugs = {slug for slug, _, _, _ in new_config["zones"]}
+        self._last_triggered = {k: v for k, v in self._last_triggered.items() if k in slugs}
+        self._handle_coordinator_update()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        points = [(float(t.get('x', 0)), float(t.get('y', 0))) for t in self.coordinator.get_targets(self._map_group)]
+        now = time.time()
+
+        zones = {}
+        for slug, name, polygon, delay in self.config["zones"]:
+            count = sum(1 for x, y in points if polygon.contains(x, y)) if polygon is not None else 0
+            if count:
+                self._last_triggered[slug] = now
+                occupied = True
+            else:
+                occupied = delay > 0 and (now - self._last_triggered.get(slug, 0)) < delay
+            zones[slug] = {"name": name, "count": count, "occupied": occupied}
+
+        if zones != self._zones:
+            self._zones = zones
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        return sum(1 for z in self._zones.values() if z["occupied"])
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "map_group": self._map_group,
+            "zones": self._zones
+        }
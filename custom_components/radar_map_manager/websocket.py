@@ -0,0 +1,117 @@
+"""Websocket commands for Radar Map Manager (V1.0.0 Release)."""
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, HEATMAP_BUCKETS
+
+
+@callback
+def async_register_commands(hass: HomeAssistant):
+    websocket_api.async_register_command(hass, ws_get_heatmap)
+    websocket_api.async_register_command(hass, ws_get_history)
+    websocket_api.async_register_command(hass, ws_get_latency)
+    websocket_api.async_register_command(hass, ws_get_load)
+    websocket_api.async_register_command(hass, ws_subscribe_raw_points)
+    websocket_api.async_register_command(hass, ws_get_zone_stats)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/heatmap",
+    vol.Required("map_group"): str,
+    vol.Optional("bucket", default="daily"): vol.In(list(HEATMAP_BUCKETS)),
+    vol.Optional("index"): vol.Coerce(int),
+})
+@callback
+def ws_get_heatmap(hass, connection, msg):
+    heatmap = hass.data.get(DOMAIN, {}).get("heatmap")
+    if heatmap is None:
+        connection.send_error(msg["id"], "not_ready", "Heatmap is not available")
+        return
+    try:
+        result = heatmap.snapshot(msg["map_group"], msg["bucket"], msg.get("index"))
+    except ValueError as e:
+        connection.send_error(msg["id"], "invalid_format", str(e))
+        return
+    connection.send_result(msg["id"], result)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/history",
+    vol.Required("map_group"): str,
+    vol.Optional("seconds", default=10): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=3600)),
+    vol.Optional("max_frames"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+})
+@callback
+def ws_get_history(hass, connection, msg):
+    history = hass.data.get(DOMAIN, {}).get("history")
+    if history is None:
+        connection.send_error(msg["id"], "not_ready", "Frame history is not available")
+        return
+    connection.send_result(msg["id"], history.query(msg["map_group"], msg["seconds"], msg.get("max_frames")))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/latency",
+    vol.Optional("radar"): str,
+})
+@callback
+def ws_get_latency(hass, connection, msg):
+    latency = hass.data.get(DOMAIN, {}).get("latency")
+    if latency is None:
+        connection.send_error(msg["id"], "not_ready", "Latency tracking is not available")
+        return
+    connection.send_result(msg["id"], latency.snapshot(msg.get("radar")))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/load",
+})
+@callback
+def ws_get_load(hass, connection, msg):
+    load = hass.data.get(DOMAIN, {}).get("load")
+    if load is None:
+        connection.send_error(msg["id"], "not_ready", "Load shedding is not available")
+        return
+    connection.send_result(msg["id"], load.as_dict())
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_raw_points",
+    vol.Required("map_group"): str,
+})
+@callback
+def ws_subscribe_raw_points(hass, connection, msg):
+    """Stream each radar's projected points, rejected ones tagged with the reason, once per fusion pass."""
+    data = hass.data.get(DOMAIN, {})
+    feed = data.get("raw_points")
+    if feed is None:
+        connection.send_error(msg["id"], "not_ready", "Raw point feed is not available")
+        return
+
+    coordinator = data.get("coordinator")
+    map_group = msg["map_group"]
+    if coordinator is not None:
+        map_group = coordinator.model.resolve_map_id(map_group) or map_group
+
+    @callback
+    def forward(payload):
+        connection.send_message(websocket_api.event_message(msg["id"], payload))
+
+    connection.subscriptions[msg["id"]] = feed.subscribe(map_group, forward)
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/zone_stats",
+    vol.Required("map_group"): str,
+    vol.Optional("zone"): str,
+})
+@callback
+def ws_get_zone_stats(hass, connection, msg):
+    zone_stats = hass.data.get(DOMAIN, {}).get("zone_stats")
+    if zone_stats is None:
+        connection.send_error(msg["id"], "not_ready", "Zone statistics are not available")
+        return
+    connection.send_result(msg["id"], zone_stats.snapshot(msg["map_group"], msg.get("zone")))
@@ -34,31 +34,96 @@ class RadarMapCardNative extends HTMLElement {
             aspectRatio: 1.0,
             mapGroup: "default",
             isAddingNew: false,
-            mousePos: null 
+            mousePos: null,
+            rawPoints: null
         };
         
         this.ignoreUpdatesUntil = 0;
         this.isCreated = false;
         this.retryTimer = null;
+        this.heatmapTimer = null;
+        this.trailTimer = null;
+        this.heartbeatTimer = null;
+        this.rawFeedKey = null;
+        this.rawFeedUnsub = null;
         this.isRendering = false;
+        this.drawFrame = null;
+
+        // The card only works while attached, on screen and in a visible tab.
+        this.isAttached = false;
+        this.inView = false;
+        this.isActive = false;
+        this.onVisibilityChange = () => this.updateActivity();
         
         this.resizeObserver = new ResizeObserver(entries => {
             for (let entry of entries) {
                 const { width, height } = entry.contentRect;
                 if (width > 0 && height > 0) {
                     this.state.aspectRatio = width / height;
-                    if (!this.isRendering && this.state.hass) {
-                        requestAnimationFrame(() => this.renderer.draw(this.state, this.config, this.state.hass));
-                    }
+                    if (this.isActive && this.state.hass) this.scheduleDraw();
                 }
             }
         });
+        this.intersectionObserver = new IntersectionObserver(entries => {
+            this.inView = entries.some(entry => entry.isIntersecting);
+            this.updateActivity();
+        });
     }
 
+    connectedCallback() {
+        this.isAttached = true;
+        document.addEventListener('visibilitychange', this.onVisibilityChange);
+        this.observeRoot();
+    }
 
     disconnectedCallback() {
+        this.isAttached = false;
+        this.inView = false;
+        document.removeEventListener('visibilitychange', this.onVisibilityChange);
         this.resizeObserver.disconnect();
-        if (this.retryTimer) clearInterval(this.retryTimer);
+        this.intersectionObserver.disconnect();
+        this.updateActivity();
+    }
+
+    observeRoot() {
+        const root = this.shadowRoot.getElementById('root');
+        if (!root || !this.isAttached) return;
+        this.resizeObserver.observe(root);
+        this.intersectionObserver.observe(root);
+    }
+
+    updateActivity() {
+        const active = this.isAttached && this.inView && !document.hidden;
+        if (active === this.isActive) return;
+        this.isActive = active;
+        if (active) this.resume();
+        else this.suspend();
+    }
+
+    suspend() {
+        if (this.heartbeatTimer) { clearInterval(this.heartbeatTimer); this.heartbeatTimer = null; }
+        if (this.retryTimer) { clearInterval(this.retryTimer); this.retryTimer = null; }
+        if (this.heatmapTimer) { clearInterval(this.heatmapTimer); this.heatmapTimer = null; }
+        if (this.trailTimer) { clearInterval(this.trailTimer); this.trailTimer = null; }
+        if (this.drawFrame) { cancelAnimationFrame(this.drawFrame); this.drawFrame = null; }
+        this.isRendering = false;
+        this.stopRawFeed();
+    }
+
+    resume() {
+        if (!this.isCreated) return;
+        this.startHeartbeat();
+        if (this._hass) this.applyHass(this._hass);
+    }
+
+    scheduleDraw() {
+        if (this.isRendering) return;
+        this.isRendering = true;
+        this.drawFrame = requestAnimationFrame(() => {
+            this.drawFrame = null;
+            this.isRendering = false;
+            this.renderer.draw(this.state, this.config, this._hass);
+        });
     }
 
     setConfig(config) {
@@ -70,39 +135,32 @@ class RadarMapCardNative extends HTMLElement {
         this.ui.render(this.state, this.config);
         this.isCreated = true;
         
-        const root = this.shadowRoot.getElementById('root');
-        if (root) this.resizeObserver.observe(root);
-        
+        this.observeRoot();
         this.initLogic();
-        this.startHeartbeat();
+        if (this.isActive) this.resume();
     }
 
     set hass(h) {
         this._hass = h;
         this.state.hass = h;
-        
-        if (this.isCreated) {
-            if (this.state.editMode === 'layout' && !this.state.dragState.isDragging) {
-                this.ui.updateLayoutInputs(this.state, h);
-            }
-            if (this.state.editMode === 'settings') {
-                this.ui.updateSettingsInputs(this.state);
-            }
+        // While hidden only the latest object is kept; resume() applies it once.
+        if (this.isCreated && this.isActive) this.applyHass(h);
+    }
 
-            this.fetchData();
-            
-            if (!this.isRendering) {
-                this.isRendering = true;
-                requestAnimationFrame(() => {
-                    this.renderer.draw(this.state, this.config, h);
-                    this.isRendering = false;
-                });
-            }
-            
-            if (!this.isRendering && !this.state.dragState.isDragging) {
-                this.ui.updateStatus(this.state, this.config);
-            }
+    applyHass(h) {
+        if (this.state.editMode === 'layout' && !this.state.dragState.isDragging) {
+            this.ui.updateLayoutInputs(this.state, h);
+        }
+        if (this.state.editMode === 'settings') {
+            this.ui.updateSettingsInputs(this.state);
         }
+
+        this.fetchData();
+        this.startHeatmap();
+        this.startTrails();
+        this.syncRawFeed();
+        
+        this.scheduleDraw();
     }
 
     fetchData(force = false) {
@@ -131,6 +189,68 @@ class RadarMapCardNative extends HTMLElement {
         }
     }
 
+    startHeatmap() {
+        if (!this.config.heatmap || this.heatmapTimer) return;
+        const rootEl = this.shadowRoot.getElementById('root');
+        if (rootEl && this.config.heatmap_opacity !== undefined) rootEl.style.setProperty('--rmm-heatmap-opacity', this.config.heatmap_opacity);
+        this.fetchHeatmap();
+        this.heatmapTimer = setInterval(() => this.fetchHeatmap(), (this.config.heatmap_refresh || 60) * 1000);
+    }
+
+    fetchHeatmap() {
+        if (!this._hass || !this._hass.connection) return;
+        const msg = { type: 'radar_map_manager/heatmap', map_group: this.state.mapGroup, bucket: this.config.heatmap_bucket || 'daily' };
+        if (this.config.heatmap_index !== undefined) msg.index = this.config.heatmap_index;
+        this._hass.connection.sendMessagePromise(msg)
+            .then(res => this.renderer.drawHeatmap(res))
+            .catch(e => console.warn("RMM: Heatmap fetch failed", e));
+    }
+
+    startTrails() {
+        if (!this.config.trails || this.trailTimer) return;
+        this.trailTimer = setInterval(() => this.fetchTrails(), (this.config.trail_refresh || 1) * 1000);
+    }
+
+    fetchTrails() {
+        if (!this._hass || !this._hass.connection) return;
+        const msg = {
+            type: 'radar_map_manager/history',
+            map_group: this.state.mapGroup,
+            seconds: this.config.trail_seconds || 10,
+            max_frames: this.config.trail_max_frames || 100
+        };
+        const globalConfig = (this.state.data && this.state.data.global_config) || {};
+        const color = this.config.fused_color || globalConfig.fused_color || '#FFD700';
+        this._hass.connection.sendMessagePromise(msg)
+            .then(res => this.renderer.drawTrails(res, color))
+            .catch(e => console.warn("RMM: Trail fetch failed", e));
+    }
+
+    syncRawFeed() {
+        const { editing, editMode, mapGroup } = this.state;
+        const key = (this.isActive && editing && editMode !== 'zone' && editMode !== 'settings') ? mapGroup : null;
+        if (key === this.rawFeedKey) return;
+
+        this.stopRawFeed();
+        this.rawFeedKey = key;
+        if (!key || !this._hass || !this._hass.connection) return;
+
+        this.rawFeedUnsub = this._hass.connection.subscribeMessage(msg => {
+            this.state.rawPoints = msg;
+            this.scheduleDraw();
+        }, { type: 'radar_map_manager/subscribe_raw_points', map_group: key });
+        this.rawFeedUnsub.catch(e => console.warn("RMM: Raw point feed failed", e));
+    }
+
+    stopRawFeed() {
+        if (this.rawFeedUnsub) {
+            this.rawFeedUnsub.then(unsub => unsub()).catch(() => {});
+            this.rawFeedUnsub = null;
+        }
+        this.rawFeedKey = null;
+        this.state.rawPoints = null;
+    }
+
     _adaptV2ToV1(v2Data) {
         const mapGroup = this.state.mapGroup;
         const v1Data = {};
@@ -156,6 +276,7 @@ class RadarMapCardNative extends HTMLElement {
                 that.state.fov_edit_mode = false; 
                 that.state.calibration = { active: false, raw: null, map: null }; 
                 that.resetSelection(); 
+                that.syncRawFeed();
                 setTimeout(() => {
                     that.ui.updateStatus(that.state, that.config);
                     if(mode === 'layout') that.ui.updateRadarList(that.state, that.config);
@@ -275,31 +396,11 @@ class RadarMapCardNative extends HTMLElement {
                 } else {
                     if (!that.state.radar) return alert("Please select a radar first.");
                     
-                    const rName = that.state.radar.toLowerCase();
-                    const xEnt = that._hass.states[`sensor.${rName}_target_1_x`];
-                    const yEnt = that._hass.states[`sensor.${rName}_target_1_y`];
-                    
-                    let rx = 0, ry = 0;
-                    
-                    if (xEnt && yEnt && xEnt.state !== 'unavailable' && yEnt.state !== 'unavailable') {
-                        rx = parseFloat(xEnt.state);
-                        ry = parseFloat(yEnt.state);
-                        const unit = xEnt.attributes.unit_of_measurement;
-                        if (unit === 'm') { rx *= 1000; ry *= 1000; }
-                        else if (unit === 'cm') { rx *= 10; ry *= 10; }
-                    } 
-                    else {
-                        const dEnt = that._hass.states[`sensor.${rName}_distance`];
-                        if (dEnt && dEnt.state !== 'unavailable') {
-                            rx = 0;
-                            ry = parseFloat(dEnt.state);
-                            const unit = dEnt.attributes.unit_of_measurement;
-                            if (unit === 'm') ry *= 1000;
-                            else if (unit === 'cm') ry *= 10;
-                        } else {
-                            return alert("No active Target 1 found on this radar. Cannot freeze.");
-                        }
-                    }
+                    const feed = that.state.rawPoints;
+                    const points = (feed && feed.radars && feed.radars[that.state.radar]) || [];
+                    const target = points.find(p => p.slot === 1);
+                    if (!target) return alert("No active Target 1 found on this radar. Cannot freeze.");
+                    const rx = target.raw_x, ry = target.raw_y;
                     
                     const layoutCfg = that.renderer.getRadarConfig(that.state, that.state.radar, that._hass);
                     const currentMapPos = that.math.calculate(layoutCfg, { x: rx, y: ry, z: 0 });
@@ -386,6 +487,7 @@ class RadarMapCardNative extends HTMLElement {
 
     enterEditMode(h) {
         this.state.editing = true;
+        this.syncRawFeed();
         this.ui.updateRadarList(this.state, this.config);
         this.state.points = [];
         this.state.dragState = { isDragging: false };
@@ -396,13 +498,18 @@ class RadarMapCardNative extends HTMLElement {
 
     exitEditMode() {
         this.state.editing = false;
+        this.syncRawFeed();
         this.state.points = [];
         this.resetSelection();
         this.ui.updateStatus(this.state, this.config);
         this.renderer.draw(this.state, this.config, this._hass);
     }
     
-    startHeartbeat() { setInterval(() => this.checkConnection(), 5000); }
+    startHeartbeat() {
+        if (this.heartbeatTimer) return;
+        this.checkConnection();
+        this.heartbeatTimer = setInterval(() => this.checkConnection(), 5000);
+    }
     checkConnection() {
         if (!this._hass) return;
         const e = this._hass.states['sensor.radar_map_manager'];
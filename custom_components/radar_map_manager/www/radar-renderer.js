@@ -1,13 +1,30 @@
+const SVG_NS = "http://www.w3.org/2000/svg";
+const TYPE_CLASSES = { 'monitor_zones': 'type-monitor', 'include_zones': 'type-include', 'exclude_zones': 'type-exclude' };
+const DEFAULT_RAW_COLORS = ['#00FF00', '#FF0000', '#00FFFF'];
+const FUSED_MATCH_GATE = 15;
+
 export class RadarRenderer {
     constructor(math, root) {
         this.math = math;
         this.root = root;
+
+        this._svg = null;
+        this._layers = null;
+        this._zoneNodes = new Map();
+        this._avatarNodes = new Map();
+        this._draftSig = null;
+        this._guideSig = null;
+
+        this._dotsLayer = null;
+        this._dots = new Map();
+        this._fusedPrev = new Map();
+        this._fusedSeq = 0;
+        this._varsSig = null;
     }
 
-    _create(tag, attrs = {}, style = {}) {
-        const el = document.createElementNS("http://www.w3.org/2000/svg", tag);
+    _create(tag, attrs = {}) {
+        const el = document.createElementNS(SVG_NS, tag);
         for (const [k, v] of Object.entries(attrs)) el.setAttribute(k, v);
-        for (const [k, v] of Object.entries(style)) el.style[k] = v;
         return el;
     }
 
@@ -41,7 +58,7 @@ export class RadarRenderer {
             mount_height: getVal('mount_height', 1.5),
             enable_correction: getVal('enable_3d', false),
             ceiling_mount: getVal('ceiling_mount', false),
-            target_height: 1.2
+            target_height: parseFloat(((state.data && state.data.global_config) || {}).target_height) || 1.5
         };
     }
 
@@ -63,7 +80,7 @@ export class RadarRenderer {
         for (let i = 0, j = pts.length - 1; i < pts.length; j = i++) {
             const xi = pts[i][0], yi = pts[i][1];
             const xj = pts[j][0], yj = pts[j][1];
-            
+
             const intersect = ((yi > y) !== (yj > y)) &&
                 (x < (xj - xi) * (y - yi) / (yj - yi) + xi);
             if (intersect) inside = !inside;
@@ -76,107 +93,195 @@ export class RadarRenderer {
         const dotsLayer = this.root.getElementById('dots-layer');
         if (!svg || !dotsLayer || !hass || !hass.states) return;
 
-        while (svg.firstChild) svg.removeChild(svg.firstChild);
-        dotsLayer.innerHTML = ''; 
+        this._ensureLayers(svg, dotsLayer);
+        this._applyStyleVars(state, config);
 
         const allRadars = this._getAllRadars(state, config, hass);
 
-        this.drawZones(state, config, svg);
-        this.drawDrawingGuides(state, svg);
+        this.drawZones(state, config);
+        this.drawDrawingGuides(state);
 
         if (state.editing && state.editMode === 'layout') {
-            this.drawRadarAvatars(state, config, svg, hass, allRadars, state.aspectRatio);
+            this.drawRadarAvatars(state, config, hass, allRadars);
+        } else {
+            this._reconcile(this._layers.avatars, this._avatarNodes, []);
         }
 
         this.drawTargets(state, config, hass, allRadars);
     }
 
-    drawDrawingGuides(state, svg) {
-        const isDrawing = state.isAddingNew || (state.editing && state.points && state.points.length > 0);
-        
-        if (!isDrawing || !state.mousePos) return;
+    _ensureLayers(svg, dotsLayer) {
+        if (this._svg !== svg || !this._layers || this._layers.zones.parentNode !== svg) {
+            while (svg.firstChild) svg.removeChild(svg.firstChild);
+            this._layers = {
+                zones: this._create('g', { class: 'layer-zones' }),
+                draft: this._create('g', { class: 'layer-draft' }),
+                guides: this._create('g', { class: 'layer-guides' }),
+                avatars: this._create('g', { class: 'layer-avatars' })
+            };
+            Object.values(this._layers).forEach(layer => svg.appendChild(layer));
+            this._svg = svg;
+            this._zoneNodes.clear();
+            this._avatarNodes.clear();
+            this._draftSig = null;
+            this._guideSig = null;
+        }
+        if (this._dotsLayer !== dotsLayer) {
+            dotsLayer.innerHTML = '';
+            this._dotsLayer = dotsLayer;
+            this._dots.clear();
+        }
+    }
 
-        const { x, y } = state.mousePos;
-        const guideStyle = {
-            stroke: '#FFD700',
-            strokeWidth: '0.2',
-            strokeDasharray: '2,2',
-            strokeOpacity: '0.6',
-            pointerEvents: 'none'
+    _applyStyleVars(state, config) {
+        const rootEl = this.root.getElementById('root');
+        if (!rootEl) return;
+
+        const globalConfig = (state.data && state.data.global_config) || {};
+        const targetRadius = config.target_radius || 8;
+        const labelSize = parseFloat(config.label_size) || 3.5;
+        const userColors = config.target_colors || [];
+
+        const vars = {
+            '--rmm-zone-stroke': config.zone_stroke || 0.8,
+            '--rmm-handle-stroke': config.handle_stroke || 1,
+            '--rmm-label-size': `${labelSize}px`,
+            '--rmm-avatar-font': `${Math.max(1.5, labelSize * 0.7)}px`,
+            '--rmm-fused-color': config.fused_color || globalConfig.fused_color || '#FFD700',
+            '--rmm-fused-size': `${targetRadius * 2}px`,
+            '--rmm-fused-font': `${Math.max(9, targetRadius * 1.3)}px`,
+            '--rmm-fused-text-stroke': `${Math.max(0.5, targetRadius * 0.08)}px`,
+            '--rmm-raw-font': `${Math.max(8, targetRadius * 1.1)}px`,
+            '--rmm-shadow-width': `${targetRadius}px`,
+            '--rmm-shadow-height': `${targetRadius / 2}px`
         };
+        DEFAULT_RAW_COLORS.forEach((def, i) => { vars[`--rmm-raw-color-${i + 1}`] = userColors[i] || def; });
+
+        const sig = JSON.stringify(vars);
+        if (sig === this._varsSig) return;
+        this._varsSig = sig;
+        Object.entries(vars).forEach(([k, v]) => rootEl.style.setProperty(k, v));
+    }
+
+    _reconcile(layer, nodes, items) {
+        const seen = new Set();
+        let ref = layer.firstChild;
+
+        items.forEach(item => {
+            seen.add(item.key);
+            let entry = nodes.get(item.key);
+            if (!entry || entry.sig !== item.sig) {
+                const el = item.build();
+                if (entry && entry.el.parentNode === layer) {
+                    layer.replaceChild(el, entry.el);
+                    if (entry.el === ref) ref = el;
+                }
+                entry = { sig: item.sig, el };
+                nodes.set(item.key, entry);
+            }
+            if (entry.el === ref) {
+                ref = ref.nextSibling;
+            } else {
+                layer.insertBefore(entry.el, ref);
+            }
+        });
+
+        for (const [key, entry] of nodes) {
+            if (!seen.has(key)) {
+                entry.el.remove();
+                nodes.delete(key);
+            }
+        }
+    }
+
+    drawDrawingGuides(state) {
+        const layer = this._layers.guides;
+        const isDrawing = state.isAddingNew || (state.editing && state.points && state.points.length > 0);
+        const sig = (isDrawing && state.mousePos) ? `${state.mousePos.x},${state.mousePos.y}` : '';
+        if (sig === this._guideSig) return;
+        this._guideSig = sig;
+
+        while (layer.firstChild) layer.removeChild(layer.firstChild);
+        if (!sig) return;
 
-        svg.appendChild(this._create('line', { x1: 0, y1: y, x2: 100, y2: y }, guideStyle));
-        svg.appendChild(this._create('line', { x1: x, y1: 0, x2: x, y2: 100 }, guideStyle));
+        const { x, y } = state.mousePos;
+        layer.appendChild(this._create('line', { x1: 0, y1: y, x2: 100, y2: y, class: 'guide-line' }));
+        layer.appendChild(this._create('line', { x1: x, y1: 0, x2: x, y2: 100, class: 'guide-line' }));
     }
 
-    drawRadarAvatars(state, config, svg, hass, radarList, aspectRatio) {
+    drawRadarAvatars(state, config, hass, radarList) {
         const currentRadar = state.radar;
-        const baseSize = parseFloat(config.label_size) || 3.5;
-        const avatarFontSize = Math.max(1.5, baseSize * 0.7);
 
-        radarList.forEach(rObj => {
+        const items = radarList.map(rObj => {
             const rName = rObj.name;
             const isCurrent = (rName === currentRadar);
-            const opacity = isCurrent ? (state.fov_edit_mode ? 0.2 : 1.0) : 0.4;
-            const strokeColor = isCurrent ? '#FFD700' : '#666';
-            const ptrEvents = state.fov_edit_mode ? 'none' : 'all'; 
-
             const cfg = this.getRadarConfig(state, rName, hass);
-            const ox = cfg.origin_x; 
-            const oy = cfg.origin_y; 
-            
-            const group = this._create('g', { 'data-id': rName, 'data-radar': rName, class: 'radar-group' });
-            
-            group.appendChild(this._create('circle', {
-                cx: ox, cy: oy, r: 1.5, class: 'radar-handle-body', 'data-id': rName, 'data-radar': rName
-            }, { fill: strokeColor, stroke: 'white', strokeWidth: '0.5', opacity: opacity, pointerEvents: ptrEvents, cursor: 'move' }));
-            
-            if (isCurrent) {
-                const handlePos = this.calculateStandardCoord({ ...cfg, mirror_x: false, enable_correction: false }, 0, 4000); 
-                const hx = handlePos.left; const hy = handlePos.top;
-
-                let pathD = "";
-                
-                if (cfg.ceiling_mount) {
-                    for (let i = 0; i <= 36; i++) {
-                        const angDeg = i * 10;
-                        const angRad = angDeg * Math.PI / 180;
-                        const pScreen = this.calculateStandardCoord({ ...cfg, enable_correction: false }, 4000 * Math.sin(angRad), 4000 * Math.cos(angRad));
-                        if (i === 0) pathD += `M ${pScreen.left} ${pScreen.top}`;
-                        else pathD += ` L ${pScreen.left} ${pScreen.top}`;
-                    }
-                    pathD += " Z";
-                } else {
-                    pathD = `M ${ox} ${oy}`;
-                    const fovWidthDeg = 120; const startAngle = -fovWidthDeg / 2;
-                    for (let i = 0; i <= 10; i++) {
-                        const angDeg = startAngle + (i / 10) * fovWidthDeg;
-                        const angRad = angDeg * Math.PI / 180;
-                        const pScreen = this.calculateStandardCoord({ ...cfg, enable_correction: false }, 4000 * Math.sin(angRad), 4000 * Math.cos(angRad));
-                        pathD += ` L ${pScreen.left} ${pScreen.top}`;
-                    }
-                    pathD += ` Z`;
-                }
+            return {
+                key: rName,
+                sig: JSON.stringify([cfg, isCurrent, !!state.fov_edit_mode]),
+                build: () => this._buildAvatar(rName, cfg, isCurrent, state.fov_edit_mode)
+            };
+        });
+
+        this._reconcile(this._layers.avatars, this._avatarNodes, items);
+    }
+
+    _buildAvatar(rName, cfg, isCurrent, fovMode) {
+        const ox = cfg.origin_x;
+        const oy = cfg.origin_y;
+
+        let groupClass = 'radar-group';
+        if (isCurrent) groupClass += ' is-current';
+        if (fovMode) groupClass += ' is-fov';
+        const group = this._create('g', { 'data-id': rName, 'data-radar': rName, class: groupClass });
+
+        group.appendChild(this._create('circle', {
+            cx: ox, cy: oy, r: 1.5, class: 'radar-handle-body', 'data-id': rName, 'data-radar': rName
+        }));
+
+        if (isCurrent) {
+            const handlePos = this.calculateStandardCoord({ ...cfg, mirror_x: false, enable_correction: false }, 0, 4000);
+            const hx = handlePos.left; const hy = handlePos.top;
+
+            let pathD = "";
 
-                group.appendChild(this._create('path', { d: pathD }, { fill: 'cyan', fillOpacity: '0.15', stroke: 'cyan', strokeWidth: '0.5', strokeDasharray: '2,1', pointerEvents: 'none' }));
-                
-                group.appendChild(this._create('line', { x1: ox, y1: oy, x2: hx, y2: hy }, { stroke: strokeColor, strokeWidth: '0.8', strokeDasharray: '4,2', opacity: opacity, pointerEvents: 'none' }));
-                
-                group.appendChild(this._create('circle', { cx: hx, cy: hy, r: 1.2, class: 'radar-handle-rot', 'data-id': rName, 'data-radar': rName }, { fill: 'cyan', stroke: 'white', strokeWidth: '0.5', opacity: opacity, pointerEvents: ptrEvents, cursor: 'alias' }));
-                
-                const txt = this._create('text', { x: hx, y: hy - 2 }, { fontSize: `${avatarFontSize}px`, fill: 'cyan', textAnchor: 'middle', fontWeight: 'bold', pointerEvents: 'none', textShadow: '1px 1px 1px black', opacity: opacity });
-                txt.textContent = `${Math.round(cfg.rotation)}°`;
-                group.appendChild(txt);
-                
-                group.appendChild(this._create('line', { x1: 0, y1: oy, x2: 100, y2: oy }, { stroke: 'rgba(255, 255, 0, 0.3)', strokeWidth: '0.2', pointerEvents: 'none' }));
-                group.appendChild(this._create('line', { x1: ox, y1: 0, x2: ox, y2: 100 }, { stroke: 'rgba(255, 255, 0, 0.3)', strokeWidth: '0.2', pointerEvents: 'none' }));
+            if (cfg.ceiling_mount) {
+                for (let i = 0; i <= 36; i++) {
+                    const angDeg = i * 10;
+                    const angRad = angDeg * Math.PI / 180;
+                    const pScreen = this.calculateStandardCoord({ ...cfg, enable_correction: false }, 4000 * Math.sin(angRad), 4000 * Math.cos(angRad));
+                    if (i === 0) pathD += `M ${pScreen.left} ${pScreen.top}`;
+                    else pathD += ` L ${pScreen.left} ${pScreen.top}`;
+                }
+                pathD += " Z";
             } else {
-                const name = this._create('text', { x: ox, y: oy + 3 }, { fontSize: `${avatarFontSize * 0.8}px`, fill: '#ccc', textAnchor: 'middle', pointerEvents: 'none', textShadow: '1px 1px 1px black' });
-                name.textContent = rName;
-                group.appendChild(name);
+                pathD = `M ${ox} ${oy}`;
+                const fovWidthDeg = 120; const startAngle = -fovWidthDeg / 2;
+                for (let i = 0; i <= 10; i++) {
+                    const angDeg = startAngle + (i / 10) * fovWidthDeg;
+                    const angRad = angDeg * Math.PI / 180;
+                    const pScreen = this.calculateStandardCoord({ ...cfg, enable_correction: false }, 4000 * Math.sin(angRad), 4000 * Math.cos(angRad));
+                    pathD += ` L ${pScreen.left} ${pScreen.top}`;
+                }
+                pathD += ` Z`;
             }
-            svg.appendChild(group);
-        });
+
+            group.appendChild(this._create('path', { d: pathD, class: 'radar-fov' }));
+            group.appendChild(this._create('line', { x1: ox, y1: oy, x2: hx, y2: hy, class: 'radar-heading' }));
+            group.appendChild(this._create('circle', { cx: hx, cy: hy, r: 1.2, class: 'radar-handle-rot', 'data-id': rName, 'data-radar': rName }));
+
+            const txt = this._create('text', { x: hx, y: hy - 2, class: 'radar-angle' });
+            txt.textContent = `${Math.round(cfg.rotation)}°`;
+            group.appendChild(txt);
+
+            group.appendChild(this._create('line', { x1: 0, y1: oy, x2: 100, y2: oy, class: 'radar-axis' }));
+            group.appendChild(this._create('line', { x1: ox, y1: 0, x2: ox, y2: 100, class: 'radar-axis' }));
+        } else {
+            const name = this._create('text', { x: ox, y: oy + 3, class: 'radar-name' });
+            name.textContent = rName;
+            group.appendChild(name);
+        }
+        return group;
     }
 
     _calculateArea(points) {
@@ -186,25 +291,21 @@ export class RadarRenderer {
         return Math.abs(area / 2);
     }
 
-    drawZones(state, config, svg) {
-        if (!state.editing) return;
-        if (state.editMode === 'settings') return;
-        
+    drawZones(state, config) {
+        if (!state.editing || state.editMode === 'settings') {
+            this._reconcile(this._layers.zones, this._zoneNodes, []);
+            this._drawDraft(state, config);
+            return;
+        }
+
         const isLayout = state.editMode === 'layout';
-        const baseR = config.handle_radius || 4; 
-        const zoneStroke = config.zone_stroke || 0.8; 
-        const showLabels = config.show_labels !== false; 
-        const handleStroke = config.handle_stroke || 1; 
-        const labelSize = parseFloat(config.label_size) || 3.5;
-        
-        const TYPE_COLORS = { 'monitor_zones': '#FFD700', 'include_zones': '#00FF00', 'exclude_zones': '#FF0000' };
+        const baseR = config.handle_radius || 4;
+        const showLabels = config.show_labels !== false;
 
-        const createPoly = (obj, typeKey, pIdx, rName) => {
-            const group = this._create('g', { 'data-type': typeKey, 'data-index': pIdx, 'data-radar': rName || '' });
+        const describe = (obj, typeKey, pIdx, rName) => {
             const pts = Array.isArray(obj) ? obj : obj.points;
             if (!pts || pts.length === 0) return null;
-            const ptsStr = pts.map(p => p.join(',')).join(' ');
-            
+
             let isSelZone = false;
             if (isLayout) {
                 if (typeKey === 'monitor_zones' && rName === state.radar && state.selectedIndex === pIdx) isSelZone = true;
@@ -212,238 +313,296 @@ export class RadarRenderer {
                 if (typeKey === state.type && state.selectedIndex === pIdx) isSelZone = true;
             }
 
-            const color = TYPE_COLORS[typeKey] || 'white';
-            let strokeColor = color; let strokeWidth = zoneStroke; let fillOpacity = 0.2; let ptrEvents = 'all'; let strokeOpacity = 1.0; 
-            let cursorStyle = 'pointer';
-
+            const classes = ['zone-poly', TYPE_CLASSES[typeKey] || ''];
             if (isLayout) {
-                if (typeKey !== 'monitor_zones') return null; 
+                if (typeKey !== 'monitor_zones') return null;
                 if (rName === state.radar) {
-                    if (!state.fov_edit_mode) { ptrEvents = 'none'; fillOpacity = 0.2; strokeWidth = zoneStroke * 0.8; cursorStyle = 'default'; } 
-                    else { ptrEvents = 'all'; fillOpacity = 0.4; strokeColor = '#FFD700'; }
-                    if (isSelZone) { strokeColor = '#00FFFF'; strokeWidth = zoneStroke * 2; fillOpacity = 0.6; }
+                    classes.push('is-current');
+                    if (state.fov_edit_mode) classes.push('is-fov');
                 } else {
-                    ptrEvents = 'none'; fillOpacity = 0.05; strokeOpacity = 0.2; strokeWidth = zoneStroke * 0.5; 
+                    classes.push('is-other');
                 }
             } else {
-                if (typeKey === 'monitor_zones') return null; 
-                if (typeKey === state.type) {
-                    fillOpacity = 0.3; ptrEvents = 'all'; 
-                    if (isSelZone) { strokeColor = '#00FFFF'; strokeWidth = zoneStroke * 2; fillOpacity = 0.5; }
-                } else {
-                    fillOpacity = 0.05; strokeColor = '#555'; ptrEvents = 'none';
-                }
+                if (typeKey === 'monitor_zones') return null;
+                classes.push(typeKey === state.type ? 'is-active' : 'is-dim');
             }
+            if (isSelZone) classes.push('is-selected');
 
-            group.appendChild(this._create('polygon', { 
-                points: ptsStr, class: 'zone-poly', 'data-type': typeKey, 'data-index': pIdx, 'data-radar': rName || ''
-            }, { fill: color, fillOpacity: fillOpacity, stroke: strokeColor, strokeWidth: strokeWidth, strokeOpacity: strokeOpacity, pointerEvents: ptrEvents, cursor: cursorStyle }));
+            const label = (showLabels && obj.name && (isSelZone || state.fov_edit_mode || !isLayout)) ? obj.name : null;
 
-            if (showLabels && obj.name && (isSelZone || state.fov_edit_mode || !isLayout)) {
-                const center = this.math.getCentroid(pts);
-                const txt = this._create('text', { x: center[0], y: center[1], class: 'zone-label' }, { fontSize: `${labelSize}px`, fill: 'white', textAnchor: 'middle', pointerEvents: 'none', textShadow: '1px 1px 2px black', opacity: 1 });
-                txt.textContent = obj.name;
-                group.appendChild(txt);
-            }
-            
+            let handles = null;
             if (isSelZone) {
-                pts.forEach((p, iIdx) => {
+                handles = pts.map((p, iIdx) => {
                     const isDrag = state.dragState?.isDragging && state.dragState.polyIndex === pIdx && state.dragState.pointIndex === iIdx;
                     const isSelPt = (state.selectedPointIndex === iIdx);
-                    const r = (isDrag || isSelPt) ? (baseR * 1.5) : baseR;
-                    let fill = "rgba(255,255,255,0.4)"; let stroke = "none"; let strokeW = 0;
-                    if (isDrag) { fill = color; stroke = "white"; strokeW = handleStroke; }
-                    else if (isSelPt) { fill = "cyan"; stroke = "white"; strokeW = handleStroke; }
-                    
-                    group.appendChild(this._create('circle', { 
-                        cx: p[0], cy: p[1], r: r, class: 'zone-handle', 'data-type': typeKey, 'data-index': pIdx, 'data-point-index': iIdx, 'data-radar': rName || ''
-                    }, { fill: fill, stroke: stroke, strokeWidth: strokeW, pointerEvents: 'all', cursor: 'move' }));
+                    return { p, iIdx, state: isDrag ? 'is-drag' : (isSelPt ? 'is-selected' : '') };
                 });
             }
-            return group;
+
+            const ptsStr = pts.map(p => p.join(',')).join(' ');
+            const sig = [ptsStr, classes.join(' '), label, baseR, handles && handles.map(h => h.state).join(',')].join('|');
+            return {
+                key: `${typeKey}:${rName || ''}:${pIdx}`,
+                sig,
+                build: () => this._buildZone(pts, ptsStr, classes, typeKey, pIdx, rName, label, handles, baseR)
+            };
         };
 
         let drawTasks = [];
         if (state.data) {
             Object.keys(state.data).forEach(rName => {
-                if (['global_zones', 'global_config', '[object Object]', 'rd_default'].includes(rName)) return; 
+                if (['global_zones', 'global_config', '[object Object]', 'rd_default'].includes(rName)) return;
                 if(state.data[rName] && Array.isArray(state.data[rName]['monitor_zones'])) {
                     state.data[rName]['monitor_zones'].forEach((p, i) => drawTasks.push({ obj: p, type: 'monitor_zones', idx: i, rName: rName, area: this._calculateArea(Array.isArray(p)?p:p.points) }));
                 }
             });
         }
-        
+
         const globalZones = (state.data && state.data.global_zones) || {};
         ['include_zones', 'exclude_zones'].forEach(tKey => {
             const list = globalZones[tKey];
             if (Array.isArray(list)) {
-                list.forEach((p, i) => drawTasks.push({ obj: p, type: tKey, idx: i, rName: 'global', area: this._calculateArea(Array.isArray(p)?p:p.points) })); 
+                list.forEach((p, i) => drawTasks.push({ obj: p, type: tKey, idx: i, rName: 'global', area: this._calculateArea(Array.isArray(p)?p:p.points) }));
             }
         });
 
         drawTasks.sort((a, b) => b.area - a.area);
-        drawTasks.forEach(task => { const el = createPoly(task.obj, task.type, task.idx, task.rName); if (el) svg.appendChild(el); });
-        
-        if (state.points.length > 0) {
-            let activeType = state.type; if (state.fov_edit_mode) activeType = 'monitor_zones';
-            const color = TYPE_COLORS[activeType] || 'white';
-            state.points.forEach(p => svg.appendChild(this._create('circle', { cx: p[0], cy: p[1], r: baseR }, { fill: 'white', fillOpacity: 0.5, pointerEvents: 'none' })));
-            const ptsStr = state.points.map(p => p.join(',')).join(' ');
-            if (state.points.length >= 3) svg.appendChild(this._create('polygon', { points: ptsStr }, { fill: color, fillOpacity: 0.2, stroke: color, strokeWidth: zoneStroke, strokeDasharray: "4,2", pointerEvents: 'none' }));
-            else svg.appendChild(this._create('polyline', { points: ptsStr }, { fill: 'none', stroke: color, strokeWidth: zoneStroke, pointerEvents: 'none' }));
+        const items = [];
+        drawTasks.forEach(task => { const item = describe(task.obj, task.type, task.idx, task.rName); if (item) items.push(item); });
+
+        this._reconcile(this._layers.zones, this._zoneNodes, items);
+        this._drawDraft(state, config);
+    }
+
+    _buildZone(pts, ptsStr, classes, typeKey, pIdx, rName, label, handles, baseR) {
+        const group = this._create('g', { class: `zone-group ${TYPE_CLASSES[typeKey] || ''}`, 'data-type': typeKey, 'data-index': pIdx, 'data-radar': rName || '' });
+
+        group.appendChild(this._create('polygon', {
+            points: ptsStr, class: classes.join(' '), 'data-type': typeKey, 'data-index': pIdx, 'data-radar': rName || ''
+        }));
+
+        if (label) {
+            const center = this.math.getCentroid(pts);
+            const txt = this._create('text', { x: center[0], y: center[1], class: 'zone-label' });
+            txt.textContent = label;
+            group.appendChild(txt);
         }
+
+        if (handles) {
+            handles.forEach(h => {
+                const r = h.state ? (baseR * 1.5) : baseR;
+                group.appendChild(this._create('circle', {
+                    cx: h.p[0], cy: h.p[1], r: r, class: `zone-handle ${h.state}`, 'data-type': typeKey, 'data-index': pIdx, 'data-point-index': h.iIdx, 'data-radar': rName || ''
+                }));
+            });
+        }
+        return group;
+    }
+
+    _drawDraft(state, config) {
+        const layer = this._layers.draft;
+        const points = (state.editing && state.editMode !== 'settings' && state.points) ? state.points : [];
+        let activeType = state.type; if (state.fov_edit_mode) activeType = 'monitor_zones';
+        const baseR = config.handle_radius || 4;
+        const ptsStr = points.map(p => p.join(',')).join(' ');
+
+        const sig = points.length > 0 ? `${activeType}|${baseR}|${ptsStr}` : '';
+        if (sig === this._draftSig) return;
+        this._draftSig = sig;
+
+        while (layer.firstChild) layer.removeChild(layer.firstChild);
+        if (!sig) return;
+
+        layer.setAttribute('class', `layer-draft ${TYPE_CLASSES[activeType] || ''}`);
+        points.forEach(p => layer.appendChild(this._create('circle', { cx: p[0], cy: p[1], r: baseR, class: 'draft-point' })));
+        if (points.length >= 3) layer.appendChild(this._create('polygon', { points: ptsStr, class: 'draft-poly' }));
+        else layer.appendChild(this._create('polyline', { points: ptsStr, class: 'draft-line' }));
     }
-    
+
     drawTargets(state, config, hass, radarList) {
-        const layer = this.root.getElementById('dots-layer');
-        if (!layer) return; 
+        const items = [];
 
         if (state.calibration && state.calibration.active && state.calibration.map) {
-            const tx = state.calibration.map.x; const ty = state.calibration.map.y;
-            const dot = document.createElement('div'); 
-            dot.className = 'dot'; dot.style.width = '12px'; dot.style.height = '12px'; 
-            dot.style.background = 'red'; dot.style.border = '2px solid white'; dot.style.boxShadow = '0 0 10px red'; 
-            dot.style.left = tx + '%'; dot.style.top = ty + '%'; dot.style.zIndex = '100'; dot.innerText = '+';
-            layer.appendChild(dot);
+            items.push({ key: 'calib', cls: 'dot calib', x: state.calibration.map.x, y: state.calibration.map.y, text: '+' });
+            this._fusedPrev.clear();
+            this._syncDots(items);
             return;
         }
 
-        const targetRadius = config.target_radius || 8;
         const showLabels = config.show_labels !== false;
-        
-        const mapGroup = state.mapGroup || "default";
-        const safeId = mapGroup.toLowerCase().replace(/ /g, "_");
-        const fusionEnt = hass.states[`sensor.rmm_${safeId}_master`];
-        const hasFusionData = fusionEnt && fusionEnt.attributes.targets && fusionEnt.attributes.targets.length > 0;
-        
-        const globalConfig = (state.data && state.data.global_config) || {};
-        const fusedColor = config.fused_color || globalConfig.fused_color || '#FFD700';
-
-        const globalZones = (state.data && state.data.global_zones) || {};
-        const excludeZones = globalZones.exclude_zones || [];
 
         if (state.editMode === 'zone' || state.editMode === 'settings' || !state.editing) {
-            if (hasFusionData) {
-                fusionEnt.attributes.targets.forEach(t => {
-                    if (excludeZones.some(z => this._isPointInPoly(t.x, t.y, z))) {
-                        return; 
-                    }
-
-                    const dot = document.createElement('div');
-                    dot.className = 'dot';
-                    dot.style.width = `${targetRadius * 2}px`; 
-                    dot.style.height = `${targetRadius * 2}px`;
-                    
-                    dot.style.background = fusedColor;
-                    dot.style.border = '2px solid white'; 
-                    dot.style.boxShadow = `0 0 8px ${fusedColor}`; 
-                    
-                    dot.style.color = 'white'; 
-                    const strokeW = Math.max(0.5, targetRadius * 0.08); 
-                    dot.style.webkitTextStroke = `${strokeW}px black`;
-                    dot.style.paintOrder = "stroke fill"; 
-                    dot.style.textShadow = 'none'; 
-                    
-                    dot.style.fontWeight = '900'; 
-                    const fontSize = Math.max(9, targetRadius * 1.3); 
-                    dot.style.fontSize = `${fontSize}px`;
-                    
-                    dot.style.transition = 'left 0.2s linear, top 0.2s linear';
-                    dot.style.left = t.x + '%'; 
-                    dot.style.top = t.y + '%'; 
-                    const label = t.id ? t.id.replace('target_', '') : '';
-                    dot.innerText = label;
-                    if (showLabels) dot.title = `Fused ID: ${t.id}\nSources: ${t.sources}`;
-                    layer.appendChild(dot);
+            const mapGroup = state.mapGroup || "default";
+            const safeId = mapGroup.toLowerCase().replace(/ /g, "_");
+            const fusionEnt = hass.states[`sensor.rmm_${safeId}_master`];
+            const targets = (fusionEnt && fusionEnt.attributes.targets) || [];
+
+            const globalZones = (state.data && state.data.global_zones) || {};
+            const excludeZones = globalZones.exclude_zones || [];
+
+            const visible = targets.filter(t => !excludeZones.some(z => this._isPointInPoly(t.x, t.y, z)));
+            const keys = this._matchFused(visible);
+
+            visible.forEach((t, idx) => {
+                items.push({
+                    key: keys[idx],
+                    cls: 'dot fused',
+                    x: t.x,
+                    y: t.y,
+                    text: t.id ? t.id.replace('target_', '') : '',
+                    title: showLabels ? `Fused ID: ${t.id}\nSources: ${t.sources}` : ''
                 });
-            }
-            return; 
+            });
+            this._syncDots(items);
+            return;
         }
 
-        const defColors = ['#00FF00', '#FF0000', '#00FFFF'];
-        const userColors = config.target_colors || [];
+        // Points arrive already projected and filtered by the fusion engine; only the
+        // radar whose layout is being edited is re-projected from its raw sensor frame.
+        this._fusedPrev.clear();
+        const feed = state.rawPoints;
+        const radars = (feed && feed.radars) || {};
         const targetsToDraw = radarList || this._getAllRadars(state, config, hass);
-        
+        const hasDraft = state.editMode === 'layout' && state.layoutChanges && Object.keys(state.layoutChanges).length > 0;
+
         targetsToDraw.forEach(rObj => {
             const rName = rObj.name;
-            const cfg = this.getRadarConfig(state, rName, hass);
-            for (let i = 1; i <= 3; i++) {
-                this.processTarget(hass, rName, i, cfg, targetRadius, showLabels, userColors, defColors, null, layer);
-            }
+            const cfg = (hasDraft && rName === state.radar) ? this.getRadarConfig(state, rName, hass) : null;
+
+            (radars[rName] || []).forEach(p => {
+                const i = p.slot;
+                let left = p.x, top = p.y;
+                if (cfg) {
+                    const ground = this.math.calculate(cfg, { x: p.raw_x, y: p.raw_y, z: 0 });
+                    left = ground.left; top = ground.top;
+                }
+
+                const colorIdx = (i > 9) ? (i % DEFAULT_RAW_COLORS.length) : (i - 1);
+                const key = `raw:${rName}:${i}`;
+                items.push({ key: `${key}:shadow`, cls: 'base-shadow', x: left, y: top });
+                items.push({
+                    key,
+                    cls: `dot raw raw-${colorIdx + 1}${p.excluded ? ' is-excluded' : ''}`,
+                    x: left,
+                    y: top,
+                    text: showLabels ? (p.is_1d ? "D" : ((i > 9) ? "D" : String(i))) : '',
+                    title: p.excluded ? `${rName} #${i}: ${p.excluded}` : ''
+                });
+            });
         });
+        this._syncDots(items);
     }
 
-    processTarget(hass, rName, i, cfg, radius, showLbl, uCols, dCols, unitOverride, layer) {
-        const lowerName = rName.toLowerCase();
-        let xs = hass.states[`sensor.${lowerName}_target_${i}_x`];
-        let ys = hass.states[`sensor.${lowerName}_target_${i}_y`];
-        let zs = hass.states[`sensor.${lowerName}_target_${i}_z`];
-        let is1D = false; 
-        
-        if (!ys || ys.state === 'unavailable') {
-            const possibleDistEntities = [`sensor.${lowerName}_distance`, `sensor.${lowerName}_target_${i}_distance`];
-            for (const entId of possibleDistEntities) {
-                const ent = hass.states[entId];
-                if (ent && ent.state !== 'unavailable') {
-                    if (entId.includes(`target_${i}`) || i === 1) { ys = ent; xs = null; is1D = true; break; }
-                }
+    _matchFused(targets) {
+        // target_N ids follow cluster order, so each dot keeps the key of the nearest previous dot.
+        const pairs = [];
+        targets.forEach((t, idx) => {
+            for (const [key, p] of this._fusedPrev) {
+                const d = Math.hypot(p.x - t.x, p.y - t.y);
+                if (d <= FUSED_MATCH_GATE) pairs.push([d, idx, key]);
             }
-        }
+        });
+        pairs.sort((a, b) => a[0] - b[0]);
+
+        const keys = new Array(targets.length);
+        const taken = new Set();
+        pairs.forEach(([, idx, key]) => {
+            if (keys[idx] || taken.has(key)) return;
+            keys[idx] = key;
+            taken.add(key);
+        });
+
+        const next = new Map();
+        targets.forEach((t, idx) => {
+            if (!keys[idx]) keys[idx] = `fused:${++this._fusedSeq}`;
+            next.set(keys[idx], { x: t.x, y: t.y });
+        });
+        this._fusedPrev = next;
+        return keys;
+    }
 
-        if (ys && ys.state !== 'unavailable') {
-            let yVal = parseFloat(ys.state);
-            let unit = unitOverride || ys.attributes.unit_of_measurement;
-            let xVal = 0; let zVal = 0;
-            if (xs && xs.state !== 'unavailable') xVal = parseFloat(xs.state);
-            if (zs && zs.state !== 'unavailable') zVal = parseFloat(zs.state);
-            if (isNaN(yVal)) return false;
-
-            if (!unit) { 
-                if (Math.abs(yVal) < 50) unit = 'm'; 
-                else unit = 'mm'; 
+    _syncDots(items) {
+        const layer = this._dotsLayer;
+        const seen = new Set();
+
+        items.forEach(item => {
+            seen.add(item.key);
+            let entry = this._dots.get(item.key);
+            if (!entry) {
+                const el = document.createElement('div');
+                el.className = item.cls;
+                layer.appendChild(el);
+                entry = { el, cls: item.cls, x: null, y: null, text: '', title: '' };
+                this._dots.set(item.key, entry);
             }
-            if (unit === 'cm') { xVal*=10; yVal*=10; zVal*=10; } 
-            else if (unit === 'm') { xVal*=1000; yVal*=1000; zVal*=1000; }
+            if (entry.cls !== item.cls) { entry.el.className = item.cls; entry.cls = item.cls; }
+            if (entry.x !== item.x) { entry.el.style.left = item.x + '%'; entry.x = item.x; }
+            if (entry.y !== item.y) { entry.el.style.top = item.y + '%'; entry.y = item.y; }
+            const text = item.text || '';
+            if (entry.text !== text) { entry.el.textContent = text; entry.text = text; }
+            const title = item.title || '';
+            if (entry.title !== title) { entry.el.title = title; entry.title = title; }
+        });
 
-            if (Math.abs(yVal) > 10) {
-                this.renderDot(layer, i, xVal, yVal, zVal, cfg, radius, showLbl, uCols, dCols, is1D);
-                return true;
+        for (const [key, entry] of this._dots) {
+            if (!seen.has(key)) {
+                entry.el.remove();
+                this._dots.delete(key);
             }
         }
-        return false;
     }
 
-    renderDot(layer, idx, xVal, yVal, zVal, cfg, r, showLbl, uCols, dCols, is1D) {
-        const ground = this.math.calculate(cfg, { x: xVal, y: yVal, z: zVal });
-        
-        const shadow = document.createElement('div'); 
-        shadow.className = 'base-shadow'; 
-        shadow.style.width = `${r}px`; 
-        shadow.style.height = `${r / 2}px`;
-        shadow.style.left = ground.left + '%'; 
-        shadow.style.top = ground.top + '%';
-        shadow.style.transition = 'left 0.2s linear, top 0.2s linear'; 
-        layer.appendChild(shadow);
-        
-        const dot = document.createElement('div'); 
-        dot.className = 'dot'; 
-        dot.style.width = `${r * 2}px`; 
-        dot.style.height = `${r * 2}px`;
-        
-        const colorIdx = (typeof idx === 'number') ? ((idx > 9) ? (idx % dCols.length) : (idx - 1)) : 0;
-        const col = uCols[colorIdx] || dCols[colorIdx % dCols.length] || 'white';
-        
-        dot.style.background = col; 
-        dot.style.color = 'black'; 
-        dot.style.textShadow = '0 0 1px white';
-        const fontSize = Math.max(8, r * 1.1); 
-        dot.style.fontSize = `${fontSize}px`;
-        dot.style.transition = 'left 0.2s linear, top 0.2s linear';
-        
-        if (showLbl) dot.innerText = is1D ? "D" : ((idx > 9) ? "D" : idx);
-        
-        dot.style.left = ground.left + '%'; 
-        dot.style.top = ground.top + '%';
-        layer.appendChild(dot);
+    drawHeatmap(payload) {
+        const canvas = this.root.getElementById('heatmap-layer');
+        if (!canvas) return;
+        if (!payload || !payload.grid || !payload.max_seconds) {
+            canvas.classList.remove('show');
+            return;
+        }
+
+        const res = payload.resolution;
+        const raw = atob(payload.grid);
+        if (canvas.width !== res || canvas.height !== res) { canvas.width = res; canvas.height = res; }
+
+        const ctx = canvas.getContext('2d');
+        const img = ctx.createImageData(res, res);
+        const px = img.data;
+        for (let i = 0; i < raw.length; i++) {
+            const v = raw.charCodeAt(i);
+            if (v === 0) continue;
+            const t = v / 255;
+            const o = i * 4;
+            px[o] = 255;
+            px[o + 1] = Math.round(255 * (1 - t));
+            px[o + 2] = 0;
+            px[o + 3] = Math.round(60 + 195 * t);
+        }
+        ctx.putImageData(img, 0, 0);
+        canvas.classList.add('show');
+    }
+
+    drawTrails(payload, color) {
+        const canvas = this.root.getElementById('trail-layer');
+        if (!canvas) return;
+        const rect = canvas.getBoundingClientRect();
+        const w = Math.round(rect.width); const h = Math.round(rect.height);
+        if (!w || !h) return;
+        if (canvas.width !== w || canvas.height !== h) { canvas.width = w; canvas.height = h; }
+
+        const ctx = canvas.getContext('2d');
+        ctx.clearRect(0, 0, w, h);
+        if (!payload || !payload.frames || payload.frames.length === 0) return;
+
+        const span = payload.seconds || 1;
+        ctx.fillStyle = color;
+        payload.frames.forEach(([age, xy]) => {
+            ctx.globalAlpha = Math.max(0.05, 1 + age / span) * 0.6;
+            for (let i = 0; i + 1 < xy.length; i += 2) {
+                ctx.beginPath();
+                ctx.arc(xy[i] / 100 * w, xy[i + 1] / 100 * h, 2.5, 0, Math.PI * 2);
+                ctx.fill();
+            }
+        });
+        ctx.globalAlpha = 1;
     }
-}
\ No newline at end of file
+}
@@ -21,7 +21,9 @@ export class RadarUI {
             
             container.innerHTML = `
                 <div id="map-container"></div>
+                <canvas id="heatmap-layer"></canvas>
                 <svg id="svg-canvas" viewBox="0 0 100 100" preserveAspectRatio="none"></svg>
+                <canvas id="trail-layer"></canvas>
                 <div id="dots-layer"></div>
                 <div id="click-layer"></div>
                 <button id="btn-toggle-mode" title="Toggle Edit Mode">⚙️</button>
@@ -83,11 +85,47 @@ export class RadarUI {
             :host { display: block; position: relative; overflow: hidden; width: 100%; height: 100%; isolation: isolate; }
             #root { position: relative; width: 100%; height: 100%; user-select: none; overflow: hidden; box-sizing: border-box; }
             
+            #heatmap-layer { position: absolute; top: 0; left: 0; width: 100%; height: 100%; z-index: 0; pointer-events: none; display: none; opacity: var(--rmm-heatmap-opacity, 0.6); }
+            #heatmap-layer.show { display: block; }
+            #trail-layer { position: absolute; top: 0; left: 0; width: 100%; height: 100%; z-index: 1; pointer-events: none; }
             #svg-canvas { position: absolute; top: 0; left: 0; width: 100%; height: 100%; z-index: 1; pointer-events: none; }
-            .zone-poly { cursor: pointer; transition: fill-opacity 0.2s; }
-            .zone-handle { cursor: move; }
-            .radar-handle-body { cursor: move; }
-            .radar-handle-rot { cursor: alias; }
+            .zone-poly { cursor: pointer; transition: fill-opacity 0.2s; fill: white; stroke: white; fill-opacity: 0.2; stroke-width: var(--rmm-zone-stroke, 0.8); pointer-events: all; }
+            .zone-poly.type-monitor { fill: #FFD700; stroke: #FFD700; }
+            .zone-poly.type-include { fill: #00FF00; stroke: #00FF00; }
+            .zone-poly.type-exclude { fill: #FF0000; stroke: #FF0000; }
+            .zone-poly.is-active { fill-opacity: 0.3; }
+            .zone-poly.is-dim { fill-opacity: 0.05; stroke: #555; pointer-events: none; }
+            .zone-poly.is-current { stroke-width: calc(var(--rmm-zone-stroke, 0.8) * 0.8); pointer-events: none; cursor: default; }
+            .zone-poly.is-current.is-fov { fill-opacity: 0.4; stroke: #FFD700; stroke-width: var(--rmm-zone-stroke, 0.8); pointer-events: all; cursor: pointer; }
+            .zone-poly.is-other { fill-opacity: 0.05; stroke-opacity: 0.2; stroke-width: calc(var(--rmm-zone-stroke, 0.8) * 0.5); pointer-events: none; }
+            .zone-poly.is-active.is-selected { stroke: #00FFFF; stroke-width: calc(var(--rmm-zone-stroke, 0.8) * 2); fill-opacity: 0.5; }
+            .zone-poly.is-current.is-selected { stroke: #00FFFF; stroke-width: calc(var(--rmm-zone-stroke, 0.8) * 2); fill-opacity: 0.6; }
+            .zone-handle { cursor: move; fill: rgba(255,255,255,0.4); stroke: none; pointer-events: all; }
+            .zone-handle.is-selected { fill: cyan; stroke: white; stroke-width: var(--rmm-handle-stroke, 1); }
+            .zone-handle.is-drag { stroke: white; stroke-width: var(--rmm-handle-stroke, 1); }
+            .type-monitor .zone-handle.is-drag { fill: #FFD700; }
+            .type-include .zone-handle.is-drag { fill: #00FF00; }
+            .type-exclude .zone-handle.is-drag { fill: #FF0000; }
+
+            .layer-draft { --rmm-draft-color: white; pointer-events: none; }
+            .layer-draft.type-monitor { --rmm-draft-color: #FFD700; }
+            .layer-draft.type-include { --rmm-draft-color: #00FF00; }
+            .layer-draft.type-exclude { --rmm-draft-color: #FF0000; }
+            .draft-point { fill: white; fill-opacity: 0.5; }
+            .draft-poly { fill: var(--rmm-draft-color); fill-opacity: 0.2; stroke: var(--rmm-draft-color); stroke-width: var(--rmm-zone-stroke, 0.8); stroke-dasharray: 4,2; }
+            .draft-line { fill: none; stroke: var(--rmm-draft-color); stroke-width: var(--rmm-zone-stroke, 0.8); }
+            .guide-line { stroke: #FFD700; stroke-width: 0.2; stroke-dasharray: 2,2; stroke-opacity: 0.6; pointer-events: none; }
+
+            .radar-handle-body { cursor: move; fill: #666; stroke: white; stroke-width: 0.5; opacity: 0.4; pointer-events: all; }
+            .radar-group.is-current .radar-handle-body { fill: #FFD700; opacity: 1; }
+            .radar-handle-rot { cursor: alias; fill: cyan; stroke: white; stroke-width: 0.5; pointer-events: all; }
+            .radar-group.is-fov .radar-handle-body, .radar-group.is-fov .radar-handle-rot { opacity: 0.2; pointer-events: none; }
+            .radar-fov { fill: cyan; fill-opacity: 0.15; stroke: cyan; stroke-width: 0.5; stroke-dasharray: 2,1; pointer-events: none; }
+            .radar-heading { stroke: #FFD700; stroke-width: 0.8; stroke-dasharray: 4,2; pointer-events: none; }
+            .radar-angle { font-size: var(--rmm-avatar-font, 2.45px); fill: cyan; text-anchor: middle; font-weight: bold; pointer-events: none; text-shadow: 1px 1px 1px black; }
+            .radar-group.is-fov .radar-heading, .radar-group.is-fov .radar-angle { opacity: 0.2; }
+            .radar-axis { stroke: rgba(255, 255, 0, 0.3); stroke-width: 0.2; pointer-events: none; }
+            .radar-name { font-size: calc(var(--rmm-avatar-font, 2.45px) * 0.8); fill: #ccc; text-anchor: middle; pointer-events: none; text-shadow: 1px 1px 1px black; }
             
             #dots-layer { position: absolute; top: 0; left: 0; width: 100%; height: 100%; z-index: 2; pointer-events: none; }
             #click-layer { position: absolute; top: 0; left: 0; width: 100%; height: 100%; z-index: 3; }
@@ -157,9 +195,16 @@ export class RadarUI {
             #btn-toggle-mode.active { background: #b71c1c; color: white; border-color: #ff5252; }
             
             .separator { height: 1px; background: #333; margin: 4px 0; }
-            .dot { position: absolute; transform: translate(-50%, -50%); border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 9px; font-weight: bold; color: white; text-shadow: 0 0 2px black; box-shadow: 0 0 3px white; pointer-events: none; }
-            .base-shadow { position: absolute; transform: translate(-50%, -50%); border-radius: 50%; background: rgba(0,0,0,0.5); filter: blur(1px); pointer-events: none; }
-            .zone-label { font-size: 3.5px; fill: white; text-anchor: middle; pointer-events: none; text-shadow: 1px 1px 2px black; }
+            .dot { position: absolute; transform: translate(-50%, -50%); border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 9px; font-weight: bold; color: white; text-shadow: 0 0 2px black; box-shadow: 0 0 3px white; pointer-events: none; transition: left 0.2s linear, top 0.2s linear; }
+            .dot.fused { width: var(--rmm-fused-size, 16px); height: var(--rmm-fused-size, 16px); background: var(--rmm-fused-color, #FFD700); border: 2px solid white; box-shadow: 0 0 8px var(--rmm-fused-color, #FFD700); color: white; -webkit-text-stroke: var(--rmm-fused-text-stroke, 0.64px) black; paint-order: stroke fill; text-shadow: none; font-weight: 900; font-size: var(--rmm-fused-font, 10.4px); }
+            .dot.raw { width: var(--rmm-fused-size, 16px); height: var(--rmm-fused-size, 16px); color: black; text-shadow: 0 0 1px white; font-size: var(--rmm-raw-font, 8.8px); }
+            .dot.raw-1 { background: var(--rmm-raw-color-1, #00FF00); }
+            .dot.raw-2 { background: var(--rmm-raw-color-2, #FF0000); }
+            .dot.raw-3 { background: var(--rmm-raw-color-3, #00FFFF); }
+            .dot.raw.is-excluded { opacity: 0.35; box-shadow: none; outline: 1px dashed white; }
+            .dot.calib { width: 12px; height: 12px; background: red; border: 2px solid white; box-shadow: 0 0 10px red; z-index: 100; transition: none; }
+            .base-shadow { position: absolute; transform: translate(-50%, -50%); border-radius: 50%; background: rgba(0,0,0,0.5); filter: blur(1px); pointer-events: none; width: var(--rmm-shadow-width, 8px); height: var(--rmm-shadow-height, 4px); transition: left 0.2s linear, top 0.2s linear; }
+            .zone-label { font-size: var(--rmm-label-size, 3.5px); fill: white; text-anchor: middle; pointer-events: none; text-shadow: 1px 1px 2px black; }
         `;
     }
 
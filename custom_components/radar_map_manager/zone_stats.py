@@ -0,0 +1,276 @@
+"""Long-term zone statistics for Radar Map Manager (V1.0.0 Release)."""
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from homeassistant.core import callback
+from homeassistant.util import slugify
+
+from .const import DOMAIN, STATS_MAX_TICK, STATS_SHORT_PERIOD, STATS_SHORT_KEEP, STATS_HOUR
+
+_LOGGER = logging.getLogger(__name__)
+
+try:
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+except ImportError:
+    get_instance = async_add_external_statistics = get_last_statistics = None
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    StatisticMeanType = None
+
+
+class ZoneBucket:
+    """Accumulated occupancy of one zone over one aligned period."""
+    __slots__ = ("start", "duration", "occupied", "count_area", "max_count", "min_count", "entries")
+
+    def __init__(self, start):
+        self.start = start
+        self.duration = 0.0
+        self.occupied = 0.0
+        self.count_area = 0.0
+        self.max_count = 0
+        self.min_count = None
+        self.entries = 0
+
+    def add(self, count, dt):
+        self.duration += dt
+        self.count_area += count * dt
+        if count:
+            self.occupied += dt
+        if count > self.max_count:
+            self.max_count = count
+        if self.min_count is None or count < self.min_count:
+            self.min_count = count
+
+    @property
+    def mean_count(self):
+        return self.count_area / self.duration if self.duration else 0.0
+
+    def as_dict(self):
+        return {
+            "start": datetime.fromtimestamp(self.start, timezone.utc).isoformat(),
+            "occupied_seconds": round(self.occupied, 1),
+            "mean_count": round(self.mean_count, 3),
+            "max_count": self.max_count,
+            "entries": self.entries,
+        }
+
+
+class _ZoneSeries:
+    def __init__(self, map_group, slug, name):
+        self.map_group = map_group
+        self.slug = slug
+        self.name = name
+        self.short = deque(maxlen=STATS_SHORT_KEEP)
+        self.hours = {}
+
+    def bucket(self, period_start, hour_start):
+        if not self.short or self.short[-1].start != period_start:
+            self.short.append(ZoneBucket(period_start))
+        hour = self.hours.get(hour_start)
+        if hour is None:
+            hour = self.hours[hour_start] = ZoneBucket(hour_start)
+        return self.short[-1], hour
+
+
+class ZoneStatistics:
+    """Compiles per-zone occupancy into 5-minute and hourly buckets in memory.
+
+    Hours are written as external statistics
+    (radar_map_manager:<map>_<zone>_occupied / _count / _entries), so long-term
+    dashboards read one row per zone and hour instead of the entity state history.
+    The running hour is rewritten on every flush and on shutdown.
+    The recorder's external statistics table is hourly; the 5-minute buckets
+    cover the last day and are served over the websocket API only.
+    Series of removed or renamed zones are kept until the next flush writes
+    their partial hour.
+    """
+
+    def __init__(self, hass, coordinator):
+        self.hass = hass
+        self._coordinator = coordinator
+        self._series = {}
+        self._retired = {}
+        self._zones = {}
+        self._revision = None
+        self._last_tick = None
+        self._sums = {}
+        self._carry = {}
+
+    def _configure(self):
+        zones = {}
+        for map_id, group in self._coordinator.model.maps.items():
+            compiled = []
+            for idx, zone in enumerate(group.include_zones):
+                if zone.polygon is None: continue
+                name = zone.label("include_zones", idx)
+                slug = slugify(name)
+                key = (map_id, slug)
+                if key not in self._series:
+                    self._series[key] = self._retired.pop(key, None) or _ZoneSeries(map_id, slug, name)
+                self._series[key].name = name
+                compiled.append((self._series[key], zone.polygon))
+            zones[map_id] = compiled
+
+        live = {(s.map_group, s.slug) for compiled in zones.values() for s, _ in compiled}
+        for key in [k for k in self._series if k not in live]:
+            self._retired[key] = self._series.pop(key)
+        self._zones = zones
+        self._revision = self._coordinator.revision
+
+    def accumulate(self, targets_by_map, now=None):
+        if self._revision != self._coordinator.revision:
+            self._configure()
+
+        tick = time.monotonic()
+        if self._last_tick is None:
+            self._last_tick = tick
+            return
+        dt = min(tick - self._last_tick, STATS_MAX_TICK)
+        self._last_tick = tick
+        if dt <= 0: return
+
+        now = time.time() if now is None else now
+        period_start = now - now % STATS_SHORT_PERIOD
+        hour_start = now - now % STATS_HOUR
+
+        for map_group, compiled in self._zones.items():
+            targets = targets_by_map.get(map_group) or ()
+            points = [(t["x"], t["y"]) for t in targets]
+            for series, polygon in compiled:
+                count = sum(1 for x, y in points if polygon.contains(x, y)) if points else 0
+                short, hour = series.bucket(period_start, hour_start)
+                short.add(count, dt)
+                hour.add(count, dt)
+
+    @callback
+    def handle_zone_enter(self, event):
+        series = self._series.get((event.data.get("map_group"), event.data.get("zone_slug")))
+        if series is None: return
+        now = time.time()
+        short, hour = series.bucket(now - now % STATS_SHORT_PERIOD, now - now % STATS_HOUR)
+        short.entries += 1
+        hour.entries += 1
+
+    def snapshot(self, map_group, zone=None):
+        map_id = self._coordinator.model.resolve_map_id(map_group) or map_group
+        return {
+            "map_group": map_id,
+            "period": STATS_SHORT_PERIOD,
+            "zones": {
+                series.slug: {"name": series.name, "buckets": [b.as_dict() for b in series.short]}
+                for (m, slug), series in self._series.items()
+                if m == map_id and (zone is None or slug == slugify(zone))
+            },
+        }
+
+    async def async_flush(self, *_):
+        """Write every finished hour and the running one so far.
+
+        External statistics upsert by start, so the running hour's row is simply
+        rewritten on the next flush; only finished hours leave memory.
+        """
+        current = time.time() // STATS_HOUR * STATS_HOUR
+        pending = []
+        for series in self._series.values():
+            for start in sorted(series.hours):
+                if start < current:
+                    pending.append((series, series.hours.pop(start), True))
+                else:
+                    pending.append((series, series.hours[start], False))
+        for series in self._retired.values():
+            pending.extend((series, bucket, True) for _, bucket in sorted(series.hours.items()))
+        self._retired = {}
+        if not pending: return
+
+        if async_add_external_statistics is None or "recorder" not in self.hass.config.components:
+            finished = sum(1 for _, _, done in pending if done)
+            _LOGGER.debug(f"RMM: Recorder not loaded, dropped {finished} zone statistic hour(s).")
+            return
+
+        for series, bucket, finished in pending:
+            if bucket.duration <= 0: continue
+            await self._write(series, bucket, finished)
+
+    async def _write(self, series, bucket, finished=True):
+        base = f"{DOMAIN}:{slugify(series.map_group)}_{series.slug}"
+        title = f"RMM {series.map_group} {series.name}"
+        start = datetime.fromtimestamp(bucket.start, timezone.utc)
+
+        occupied_id = f"{base}_occupied"
+        occupied, occupied_sum = await self._running_sum(occupied_id, bucket.start, bucket.occupied, finished)
+        async_add_external_statistics(
+            self.hass,
+            self._metadata(occupied_id, f"{title} occupied time", "s", has_sum=True),
+            [{"start": start, "state": round(occupied, 1), "sum": round(occupied_sum, 1)}],
+        )
+
+        entries_id = f"{base}_entries"
+        entries, entries_sum = await self._running_sum(entries_id, bucket.start, bucket.entries, finished)
+        async_add_external_statistics(
+            self.hass,
+            self._metadata(entries_id, f"{title} entries", None, has_sum=True),
+            [{"start": start, "state": entries, "sum": entries_sum}],
+        )
+
+        count_id = f"{base}_count"
+        async_add_external_statistics(
+            self.hass,
+            self._metadata(count_id, f"{title} count", None, has_mean=True),
+            [{
+                "start": start,
+                "mean": round(bucket.mean_count, 3),
+                "min": bucket.min_count or 0,
+                "max": bucket.max_count,
+            }],
+        )
+
+    async def _running_sum(self, statistic_id, start, value, finished):
+        """State and sum for one hour row; the sum excludes any earlier write of that same hour."""
+        if statistic_id not in self._sums:
+            await self._load_sum(statistic_id, start)
+        value += self._carry.get((statistic_id, start), 0)
+        total = self._sums[statistic_id] + value
+        if finished:
+            self._sums[statistic_id] = total
+            self._carry.pop((statistic_id, start), None)
+        return value, total
+
+    async def _load_sum(self, statistic_id, start):
+        try:
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, True, {"state", "sum"}
+            )
+        except Exception as e:
+            _LOGGER.warning(f"RMM: Could not read last sum of {statistic_id}: {e}")
+            last = {}
+        rows = last.get(statistic_id) or []
+        row = rows[0] if rows else {}
+        total = row.get("sum") or 0
+        row_start = row.get("start")
+        if isinstance(row_start, datetime):
+            row_start = row_start.timestamp()
+        if row_start is not None and row_start >= start:
+            # A partial row of this hour from before a restart: continue it instead of adding to it.
+            state = row.get("state") or 0
+            total -= state
+            self._carry[(statistic_id, start)] = state
+        self._sums[statistic_id] = total
+
+    @staticmethod
+    def _metadata(statistic_id, name, unit, has_mean=False, has_sum=False):
+        metadata = {
+            "source": DOMAIN,
+            "statistic_id": statistic_id,
+            "name": name,
+            "unit_of_measurement": unit,
+            "has_mean": has_mean,
+            "has_sum": has_sum,
+        }
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = StatisticMeanType.ARITHMETIC if has_mean else StatisticMeanType.NONE
+        return metadata
@@ -0,0 +1,497 @@
+"""Differential check of the fusion engine for Radar Map Manager (V1.0.0 Release).
+
+Generates random scenarios (radars with 3D, mirrored and rotated layouts, 1D
+and 2D sensors in m/cm/mm, concave include/exclude/monitor zones, stale
+sensor states), feeds the same entity states to the frozen 1.0.0 engine in
+fusion_reference.py and to the live FusionEngine, and reports every fused
+target or zone count that differs by more than the tolerance.
+
+Between ticks each scenario edits the configuration the way the services and
+imports do: layouts, zones, global settings, radars added, removed or moved
+between map groups and whole map groups removed, so the incremental plan
+rebuild is covered. Some edits place an exclude or monitor zone with a
+vertex or an edge exactly on a radar's projected point, and every fused
+target is probed against outlines through it, so both point-in-polygon
+tests are compared on zone edges. Every scenario is replayed at each load
+level given by --levels; at level 1 and up the live engine must still match
+the reference, except that an idle map group it skips has to keep publishing
+no targets, and at level 3 positions only have to agree to the whole unit.
+A fake clock, shared with the live engine, advances between ticks so
+points go stale. The reference has no notion of point age, so states
+older than max_point_age are hidden from it.
+
+Per-tick timings of both engines are printed as a benchmark, counting only
+ticks without a config edit in scenarios without a raw point subscriber.
+With --max-ratio the run also fails when the live engine at level 0 takes
+more than that many times the reference's time per tick; wall-clock numbers
+are noisy, so the gate is off by default.
+
+Needs the integration's Python requirements (homeassistant, numpy) but no
+running instance:
+
+    python scripts/fusion_diff.py --scenarios 500 --seed 1
+
+Exits with status 1 on any divergence or a benchmark regression.
+tests/test_fusion_diff.py runs a fixed-seed slice under pytest. A failing
+scenario can be replayed alone with --seed <reported seed> --scenarios 1 --verbose.
+"""
+import argparse
+import asyncio
+import copy
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from custom_components.radar_map_manager import coordinator as coordinator_module  # noqa: E402
+from custom_components.radar_map_manager import fusion_engine as fusion_module  # noqa: E402
+from custom_components.radar_map_manager.const import LOAD_IDLE_MAP_DIVISOR  # noqa: E402
+from custom_components.radar_map_manager.fusion_engine import FusionEngine  # noqa: E402
+from custom_components.radar_map_manager.model import Polygon  # noqa: E402
+from fusion_reference import ReferenceFusionEngine, reference_point_in_polygon  # noqa: E402
+
+UNITS = ("m", "cm", "mm")
+UNIT_SCALE = {"m": 0.001, "cm": 0.1, "mm": 1.0}
+STATE_AGES = (0, 0, 0, 1, 5, 20, 120)
+MAX_POINT_AGES = (0, 0, 3, 10, 60)
+TICK_STEPS = (0.1, 0.1, 0.1, 1, 4, 15)
+EDGE_ZONE_RATE = 0.25
+
+
+class FakeClock:
+    """Wall clock shared by the states and the live engine, advanced by the harness."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeStates:
+    """State machine stand-in; with max_age set, states older than that read as missing."""
+
+    def __init__(self, clock, states=None):
+        self._clock = clock
+        self._states = {} if states is None else states
+        self.max_age = 0.0
+
+    def get(self, entity_id):
+        state = self._states.get(entity_id)
+        if (state is not None and self.max_age > 0
+                and self._clock.now - state.last_reported_timestamp > self.max_age):
+            return None
+        return state
+
+    def set(self, entity_id, value, unit, age=0):
+        reported = datetime.fromtimestamp(self._clock.now - age, timezone.utc)
+        self._states[entity_id] = SimpleNamespace(
+            state=value, attributes={"unit_of_measurement": unit},
+            last_updated=reported, last_reported=reported, last_reported_timestamp=reported.timestamp()
+        )
+
+    def async_set(self, entity_id, state, attributes=None):
+        self._states[entity_id] = SimpleNamespace(state=state, attributes=attributes or {})
+
+    def has_radar(self, lower):
+        return any(k.startswith(f"sensor.{lower}_") for k in self._states)
+
+    def clear_radar(self, lower):
+        for key in [k for k in self._states if k.startswith(f"sensor.{lower}_")]:
+            del self._states[key]
+
+
+class FakeHass:
+    def __init__(self, clock, states=None):
+        self.states = FakeStates(clock, states)
+        self.data = {}
+        self.config = SimpleNamespace(path=lambda *parts: os.path.join("/tmp", *parts), config_dir="/tmp")
+
+
+class ReferenceCoordinator:
+    def __init__(self, data):
+        self.data = data
+
+
+def live_coordinator(hass):
+    store = MagicMock()
+    store.return_value.async_save = AsyncMock()
+    with patch.object(coordinator_module, "Store", store):
+        return coordinator_module.RadarCoordinator(hass)
+
+
+def random_polygon(rng, cx, cy, radius):
+    """Star-shaped outline, concave for most draws."""
+    n = rng.randint(3, 12)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(n))
+    points = []
+    for a in angles:
+        r = radius * rng.uniform(0.3, 1.0)
+        points.append([round(cx + r * math.cos(a), 3), round(cy + r * math.sin(a), 3)])
+    return points
+
+
+def random_layout(rng):
+    layout = {
+        "origin_x": round(rng.uniform(0, 100), 2),
+        "origin_y": round(rng.uniform(0, 100), 2),
+        "scale_x": round(rng.uniform(2, 10), 2),
+        "scale_y": round(rng.uniform(2, 10), 2),
+        "rotation": round(rng.uniform(0, 360), 1),
+        "mirror_x": rng.random() < 0.3,
+        "enable_3d": rng.random() < 0.4,
+    }
+    if layout["enable_3d"]:
+        layout["mount_height"] = round(rng.uniform(0.5, 3.0), 2)
+        layout["ceiling_mount"] = rng.random() < 0.3
+    return layout
+
+
+def random_zones(rng, count, name_prefix):
+    return [
+        {
+            "name": f"{name_prefix} {i}",
+            "points": random_polygon(rng, rng.uniform(10, 90), rng.uniform(10, 90), rng.uniform(5, 40)),
+            "delay": 0,
+        }
+        for i in range(count)
+    ]
+
+
+def random_sensor(rng):
+    return {"kind": "1d" if rng.random() < 0.25 else "2d", "unit": rng.choice(UNITS)}
+
+
+def random_config(rng, sensors):
+    maps, radars = {}, {}
+    for m in range(rng.randint(1, 3)):
+        map_id = "default" if m == 0 else f"floor_{m}"
+        maps[map_id] = {"zones": {
+            "include_zones": random_zones(rng, rng.randint(1, 5), "Zone"),
+            "exclude_zones": random_zones(rng, rng.randint(0, 2), "Exclude"),
+        }}
+        for r in range(rng.randint(1, 4)):
+            name = f"Radar_{m}_{r}"
+            radars[name] = {
+                "map_group": map_id,
+                "layout": random_layout(rng),
+                "monitor_zones": random_zones(rng, 1, "Monitor") if rng.random() < 0.3 else [],
+            }
+            sensors[name] = random_sensor(rng)
+    return {
+        "version": 1,
+        "global_config": {
+            "update_interval": 0.1,
+            "merge_distance": round(rng.uniform(0.3, 1.5), 2),
+            "target_height": round(rng.uniform(1.0, 1.8), 2),
+            "max_point_age": rng.choice(MAX_POINT_AGES),
+        },
+        "maps": maps,
+        "radars": radars,
+    }
+
+
+def feed_states(rng, states, radar_names, sensors, tick):
+    """New readings for most radars; the rest keep their states untouched, as idle nodes do.
+
+    Only a radar's first states may be backdated: any later reading is stamped with the
+    current time, as Home Assistant does, and goes stale only as the clock advances.
+    """
+    for name in radar_names:
+        lower = name.lower()
+        seen = states.has_radar(lower)
+        if tick and seen and rng.random() < 0.35: continue
+        states.clear_radar(lower)
+        unit = sensors[name]["unit"]
+        scale = UNIT_SCALE[unit]
+        age = 0 if seen else rng.choice(STATE_AGES)
+
+        if sensors[name]["kind"] == "1d":
+            dist_mm = rng.choice([0.0, rng.uniform(200, 6000)])
+            states.set(f"sensor.{lower}_distance", f"{dist_mm * scale:.3f}", unit, age)
+            continue
+
+        for i in range(1, 4):
+            roll = rng.random()
+            if roll < 0.2: continue
+            if roll < 0.25:
+                states.set(f"sensor.{lower}_target_{i}_x", "unavailable", unit, age)
+                states.set(f"sensor.{lower}_target_{i}_y", "unavailable", unit, age)
+                continue
+            if roll < 0.35:
+                x_mm, y_mm = rng.uniform(-90, 90), rng.uniform(-90, 90)
+            else:
+                x_mm, y_mm = rng.uniform(-4000, 4000), rng.uniform(100, 6000)
+            states.set(f"sensor.{lower}_target_{i}_x", f"{x_mm * scale:.3f}", unit, age)
+            states.set(f"sensor.{lower}_target_{i}_y", f"{y_mm * scale:.3f}", unit, age)
+
+
+async def mutate(rng, coordinator, sensors, serial):
+    """One random edit, through the coordinator's service methods or a whole-config import."""
+    model = coordinator.model
+    radars = sorted(model.radars)
+    maps = sorted(model.maps)
+    choice = rng.random()
+
+    if choice < 0.15 and radars:
+        await coordinator.async_update_layout(rng.choice(radars), random_layout(rng))
+    elif choice < 0.3 and radars:
+        target = rng.choice(maps + [f"floor_new_{serial}"])
+        await coordinator.async_update_layout(rng.choice(radars), {}, target)
+    elif choice < 0.42:
+        name = f"Radar_new_{serial}"
+        sensors[name] = random_sensor(rng)
+        await coordinator.async_add_radar(name, rng.choice(maps + [f"floor_new_{serial}"]))
+        await coordinator.async_update_layout(name, random_layout(rng))
+    elif choice < 0.52 and radars:
+        await coordinator.async_remove_radar(rng.choice(radars))
+    elif choice < 0.65:
+        zone = random_zones(rng, 1, "Zone")[0]
+        zone["name"] = f"Zone {rng.randint(0, 5)}"
+        await coordinator.async_update_zone(None, rng.choice(["include_zones", "exclude_zones"]), zone, rng.choice(maps))
+    elif choice < 0.75:
+        key = rng.choice(["merge_distance", "max_point_age"])
+        value = round(rng.uniform(0.3, 1.5), 2) if key == "merge_distance" else rng.choice(MAX_POINT_AGES)
+        await coordinator.async_update_global_config({key: value})
+    else:
+        raw = copy.deepcopy(coordinator.data)
+        edit = rng.random()
+        extra_maps = [m for m in raw["maps"] if m != "default"]
+        if edit < 0.4 and extra_maps:
+            gone = rng.choice(extra_maps)
+            del raw["maps"][gone]
+            for name, radar in list(raw["radars"].items()):
+                if radar["map_group"] != gone: continue
+                if rng.random() < 0.5:
+                    del raw["radars"][name]
+                else:
+                    radar["map_group"] = "default"
+        elif edit < 0.7 and raw["radars"]:
+            radar = raw["radars"][rng.choice(sorted(raw["radars"]))]
+            radar["map_group"] = rng.choice(sorted(raw["maps"]))
+            radar["monitor_zones"] = random_zones(rng, 1, "Monitor") if rng.random() < 0.5 else []
+        else:
+            group = raw["maps"][rng.choice(sorted(raw["maps"]))]
+            group["zones"]["exclude_zones"] = random_zones(rng, rng.randint(0, 2), "Exclude")
+        await coordinator.async_import(raw)
+
+
+def edge_polygons(rng, x, y):
+    """Outlines with (x, y) on a vertex, on each side of an axis-aligned square and on a diagonal."""
+    d = round(rng.uniform(1, 10), 3)
+    sx, sy = rng.choice((-1, 1)), rng.choice((-1, 1))
+    return [
+        [[x, y], [x + sx * d, y], [x + sx * d, y + sy * d], [x, y + sy * d]],
+        [[x, y - d], [x + d, y - d], [x + d, y + d], [x, y + d]],
+        [[x - d, y - d], [x, y - d], [x, y + d], [x - d, y + d]],
+        [[x - d, y], [x + d, y], [x + d, y + d], [x - d, y + d]],
+        [[x - d, y - d], [x + d, y - d], [x + d, y], [x - d, y]],
+        [[x - d, y - d], [x + d, y + d], [x + d, y - d]],
+    ]
+
+
+async def place_edge_zone(rng, coordinator, reference, target_h):
+    """Put an exclude or monitor zone through a radar's projected point; False when none is live."""
+    model = coordinator.model
+    candidates = []
+    for name in sorted(model.radars):
+        for i in range(1, 4):
+            point = reference._get_radar_point(name, i)
+            if not point or point["is_1d"]: continue
+            projected = reference._calculate_standard_coord(model.radars[name].layout, point, target_h)
+            if projected and projected.get("active"):
+                candidates.append((name, projected["left"], projected["top"]))
+    if not candidates:
+        return False
+
+    name, x, y = rng.choice(candidates)
+    zone = {"name": f"Edge {rng.randint(0, 2)}", "points": rng.choice(edge_polygons(rng, x, y)), "delay": 0}
+    if rng.random() < 0.5:
+        await coordinator.async_update_zone(None, "exclude_zones", zone, model.radars[name].map_group)
+    else:
+        await coordinator.async_update_zone(name, "monitor_zones", zone)
+    return True
+
+
+def edge_probes(rng, targets):
+    """Fused targets whose edge outlines the live and the 1.0.0 zone test disagree on."""
+    problems = []
+    for t in targets:
+        x, y = float(t["x"]), float(t["y"])
+        for points in edge_polygons(rng, x, y):
+            ref_in = reference_point_in_polygon(x, y, points)
+            if Polygon.compile(points).contains(x, y) != ref_in:
+                problems.append(f"{t['id']} at ({x}, {y}) on {points}: reference says {ref_in}")
+    return problems
+
+
+def compare(ref_targets, live_targets, tolerance):
+    if len(ref_targets) != len(live_targets):
+        return [f"target count {len(ref_targets)} (reference) != {len(live_targets)} (live)"]
+    problems = []
+    for ref, live in zip(ref_targets, live_targets):
+        if abs(ref["x"] - live["x"]) > tolerance or abs(ref["y"] - live["y"]) > tolerance:
+            problems.append(f"{ref['id']} at ({ref['x']}, {ref['y']}) vs ({live['x']}, {live['y']})")
+        if ref["sources"] != live["sources"] or ref["count"] != live["count"]:
+            problems.append(f"{ref['id']} sources {ref['sources']} vs {live['sources']}")
+    return problems
+
+
+def zone_counts(zones, targets, contains):
+    return {name: sum(1 for t in targets if contains(zone, t)) for name, zone in zones}
+
+
+def whole_units(targets):
+    """Reference targets as level 3 publishes them; None when one sits on a rounding tie."""
+    rounded = []
+    for t in targets:
+        if any(abs(abs(t[k]) % 1 - 0.5) < 0.011 for k in ("x", "y")):
+            return None
+        rounded.append({**t, "x": round(t["x"]), "y": round(t["y"])})
+    return rounded
+
+
+def run_scenario(seed, level, ticks, tolerance, timings, verbose):
+    clock = FakeClock()
+    with patch.object(fusion_module, "time", clock):
+        return _run_scenario(clock, seed, level, ticks, tolerance, timings, verbose)
+
+
+def _run_scenario(clock, seed, level, ticks, tolerance, timings, verbose):
+    rng = random.Random(seed)
+    sensors = {}
+    config = random_config(rng, sensors)
+
+    live_hass = FakeHass(clock)
+    ref_hass = FakeHass(clock, live_hass.states._states)
+    live_coord = live_coordinator(live_hass)
+    live_coord.data = config
+    ref_coord = ReferenceCoordinator(copy.deepcopy(live_coord.data))
+
+    reference = ReferenceFusionEngine(ref_hass, ref_coord)
+    live = FusionEngine(live_hass, live_coord)
+    live.level = level
+    subscribed = rng.random() < 0.5
+    if subscribed:
+        live.raw_points.subscribe("default", lambda payload: None)
+
+    divergences = []
+    for tick in range(ticks):
+        if tick: clock.now += rng.choice(TICK_STEPS)
+        edited = tick and rng.random() < 0.35
+        if edited:
+            asyncio.run(mutate(rng, live_coord, sensors, tick))
+            ref_coord.data = copy.deepcopy(live_coord.data)
+
+        model = live_coord.model
+        feed_states(rng, live_hass.states, sorted(model.radars), sensors, tick)
+        ref_hass.states.max_age = float(model.global_config.get("max_point_age", 0) or 0)
+        if rng.random() < EDGE_ZONE_RATE:
+            target_h = float(model.global_config.get("target_height", 1.5))
+            if asyncio.run(place_edge_zone(rng, live_coord, reference, target_h)):
+                ref_coord.data = copy.deepcopy(live_coord.data)
+                edited = True
+        idle = {m for m in model.maps if not live_coord.targets.get(m) and not live.raw_points.wants(m)}
+
+        started = time.perf_counter()
+        live.update()
+        live_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reference.update()
+        ref_time = time.perf_counter() - started
+
+        # Only like-for-like ticks count: plan rebuilds and the raw feed have no reference counterpart.
+        if not edited and not subscribed:
+            timings[level]["live"] += live_time
+            timings[level]["reference"] += ref_time
+            timings[level]["ticks"] += 1
+        skipped = level >= 1 and (tick + 1) % LOAD_IDLE_MAP_DIVISOR != 0
+
+        for map_id, group in model.maps.items():
+            live_targets = live_coord.get_targets(map_id)
+            if skipped and map_id in idle:
+                problems = [f"idle map skipped but published {len(live_targets)} target(s)"] if live_targets else []
+            else:
+                ref_targets = ref_coord.data["maps"].get(map_id, {}).get("targets", [])
+                problems = compare(ref_targets, live_targets, max(tolerance, 0.5) if level >= 3 else tolerance)
+                problems.extend(edge_probes(rng, ref_targets))
+
+                counted = whole_units(ref_targets) if level >= 3 else ref_targets
+                zones = [(z.label("include_zones", i), z) for i, z in enumerate(group.include_zones)]
+                live_zones = zone_counts(
+                    zones, live_targets,
+                    lambda z, t: z.polygon is not None and z.polygon.contains(float(t["x"]), float(t["y"]))
+                )
+                ref_zones = live_zones if counted is None else zone_counts(
+                    zones, counted,
+                    lambda z, t: len(z.points) >= 3 and reference_point_in_polygon(float(t["x"]), float(t["y"]), z.points)
+                )
+                if ref_zones != live_zones:
+                    problems.append(f"zone counts {ref_zones} (reference) vs {live_zones} (live)")
+
+            for problem in problems:
+                divergences.append(f"seed {seed} level {level} tick {tick} map {map_id}: {problem}")
+            if verbose:
+                print(f"seed {seed} level {level} tick {tick} map {map_id}: {len(live_targets)} targets")
+
+        for map_id, targets in live_coord.targets.items():
+            if targets and map_id not in model.radars_by_map:
+                divergences.append(f"seed {seed} level {level} tick {tick}: stale targets on map {map_id} without radars")
+    return divergences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--levels", default="0,1,2,3", help="comma-separated load levels to replay each scenario at")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="map %% allowed between target positions")
+    parser.add_argument("--max-ratio", type=float, default=None,
+                        help="fail when live/reference time per tick at level 0 exceeds this (off by default)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    levels = [int(v) for v in args.levels.split(",")]
+
+    timings = {level: {"reference": 0.0, "live": 0.0, "ticks": 0} for level in levels}
+    divergences = []
+    for n in range(args.scenarios):
+        for level in levels:
+            divergences.extend(run_scenario(args.seed + n, level, args.ticks, args.tolerance, timings, args.verbose))
+
+    ratio = None
+    for level, t in timings.items():
+        ticks = max(1, t["ticks"])
+        level_ratio = t["live"] / t["reference"] if t["reference"] else 0.0
+        if level == 0:
+            ratio = level_ratio
+        print(
+            f"level {level}: {args.scenarios} scenarios, {t['ticks']} ticks: "
+            f"reference {t['reference'] / ticks * 1000:.3f} ms/tick, "
+            f"live {t['live'] / ticks * 1000:.3f} ms/tick, ratio {level_ratio:.2f}"
+        )
+
+    failed = False
+    for line in divergences[:50]:
+        print(f"DIVERGENCE {line}")
+    if divergences:
+        print(f"{len(divergences)} divergence(s) beyond tolerance {args.tolerance}")
+        failed = True
+    else:
+        print("No divergence.")
+    if args.max_ratio is not None and ratio is not None and ratio > args.max_ratio:
+        print(f"REGRESSION live engine is {ratio:.2f}x the reference at level 0 (limit {args.max_ratio})")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
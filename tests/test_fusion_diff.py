@@ -0,0 +1,24 @@
+"""Fusion engine differential check for Radar Map Manager (V1.0.0 Release).
+
+Runs a fixed-seed slice of scripts/fusion_diff.py at every load level, so the
+comparison against the frozen 1.0.0 engine is part of the offline test run.
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import fusion_diff  # noqa: E402
+
+SCENARIOS = 40
+SEED = 1000
+
+
+@pytest.mark.parametrize("level", [0, 1, 2, 3])
+def test_live_engine_matches_reference(level):
+    assert fusion_diff.main(["--scenarios", str(SCENARIOS), "--seed", str(SEED), "--levels", str(level)]) == 0